@@ -3,31 +3,86 @@
 Classes to analyze and plot EMG data from individual sessions or an entire dataset of sessions.
 """
 
+import bisect
 import os
 import pickle
-import copy
 import re
-from datetime import datetime
+from collections.abc import Mapping
 from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from pathlib import Path
 from typing import List, Optional, Union
 
+import numpy as np
 import yaml
-import tkinter as tk
-from tkinter import ttk
 
-from Plot_EMG import EMGSessionPlotter, EMGDatasetPlotter
+# Plot_EMG (matplotlib) and tkinter are imported where they are first used, so analysis-only scripts don't pay for loading them.
 import EMG_Transformer
 
 
+@lru_cache(maxsize=4096)
+def _format_dataset_date(date_string):
+    """
+    Converts a 'YYMMDD' dataset date to 'YYYY-MM-DD'. Cached, since the same dates recur across sessions and datasets.
+    """
+    return datetime.strptime(date_string, '%y%m%d').strftime('%Y-%m-%d')
+
+# Dataset directory names: '[YYMMDD] [AnimalID] [Condition]'.
+_DATASET_NAME_RE = re.compile(r'^(\d{6})\s([A-Z]\d+\.\d)\s(.+)$')
+
+@lru_cache(maxsize=1024)
+def _parse_dataset_name(dataset_name):
+    """
+    Splits a dataset name into (date, animal_id, condition), with the date as 'YYYY-MM-DD'. Returns None if the name doesn't match _DATASET_NAME_RE.
+    Cached, since the same dataset names are parsed whenever their datasets are built.
+    """
+    match = _DATASET_NAME_RE.match(dataset_name)
+    if match is None:
+        return None
+    date, animal_id, condition = match.groups()
+    return _format_dataset_date(date), animal_id, condition
+
+def _prefetch_files(file_paths):
+    """
+    Asks the OS to start reading the given files into the page cache, so later reads of them don't wait on the disk one file at a time.
+    Only a hint: does nothing on platforms without posix_fadvise, and ignores files that can't be opened.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+# Use PyYAML's LibYAML-based loader when it is available; it parses the same documents as SafeLoader, only faster.
+try:
+    from yaml import CSafeLoader as _YAMLSafeLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLSafeLoader
+
+# Parsed config files keyed by absolute path, each stored with the file's modification time when it was parsed.
+_CONFIG_CACHE = {}
+
 # Parent EMG data class. Mainly for loading config settings.
 class EMGData:
     def __init__(self, config_file='config.yml'):
         _config = self.load_config(config_file)
 
-        self.m_start = _config['m_start']
-        self.m_end = _config['m_end']
-        self.h_start = _config['h_start']
-        self.h_end = _config['h_end']
+        # Copy the per-channel window lists and the argument dicts: the config is cached and shared, so edits to one object
+        # (e.g. by update_window_settings) must not leak into the cached config or other sessions/datasets.
+        self.m_start = list(_config['m_start'])
+        self.m_end = list(_config['m_end'])
+        self.h_start = list(_config['h_start'])
+        self.h_end = list(_config['h_end'])
         self.time_window_ms = _config['time_window']
         self.bin_size = _config['bin_size']
 
@@ -37,22 +92,45 @@ class EMGData:
         self.title_font_size = _config['title_font_size']
         self.axis_label_font_size = _config['axis_label_font_size']
         self.tick_font_size = _config['tick_font_size']
-        self.subplot_adjust_args = _config['subplot_adjust_args']
-        self.m_max_args = _config['m_max_args']
+        self.subplot_adjust_args = dict(_config['subplot_adjust_args'])
+        self.m_max_args = dict(_config['m_max_args'])
 
-        self.butter_filter_args = _config['butter_filter_args']
+        self.butter_filter_args = dict(_config['butter_filter_args'])
         self.default_method = _config['default_method']
     
     def load_config(self, config_file):
         """
         Loads the config.yaml file into a YAML object that can be used to reference hard-coded configurable constants.
 
+        The parsed config is cached per file and only re-read when the file's modification time changes,
+        so creating many sessions parses the file once. The returned dict is shared and must not be modified.
+        An already-parsed config (any mapping) is returned as is.
+
         Args:
-            config_file (str): location of the 'config.yaml' file.
-        """
-        with open(config_file, 'r') as file:
-            config = yaml.safe_load(file)
+            config_file (str or Mapping): location of the 'config.yaml' file, or an already-loaded config.
+        """
+        if isinstance(config_file, Mapping):
+            return config_file
+
+        # Key on the absolute path: the default 'config.yml' is relative and names a different file in each working directory.
+        config_path = os.path.abspath(config_file)
+        mtime = os.stat(config_path).st_mtime
+        cached = _CONFIG_CACHE.get(config_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        # Read the raw bytes in one call and let the parser decode them, rather than streaming the text through the file object.
+        with open(config_path, 'rb') as file:
+            config = yaml.load(file.read(), Loader=_YAMLSafeLoader)
+        _CONFIG_CACHE[config_path] = (mtime, config)
         return config
+
+    @staticmethod
+    def clear_config_cache():
+        """
+        Clears the cached config files so the next EMGData object re-reads its config file from disk.
+        """
+        _CONFIG_CACHE.clear()
     
     @staticmethod
     def unpackPickleOutput (output_path):
@@ -64,15 +142,16 @@ class EMGData:
         """
         dataset_pickles_dict = {} #k=datasets, v=pickle_filepath(s)
 
-        for dataset in os.listdir(output_path):
-            if os.path.isdir(os.path.join(output_path, dataset)):
-                pickles = os.listdir(os.path.join(output_path, dataset))
-                pickle_paths = [os.path.join(output_path, dataset, pickle).replace('\\', '/') for pickle in pickles]
-                dataset_pickles_dict[dataset] = pickle_paths
-            else: # if this is a single session instead...
-                split_parts = dataset.split('-') # Split the string at the hyphens
-                session_name = '-'.join(split_parts[:-1]) # Select the portion before the last hyphen to drop the "-SessionData.pickle" portion.
-                dataset_pickles_dict[session_name] = os.path.join(output_path, dataset).replace('\\', '/')
+        # os.scandir entries carry their file type from the directory read, so no extra stat call is needed per entry.
+        with os.scandir(output_path) as dataset_entries:
+            for dataset_entry in dataset_entries:
+                if dataset_entry.is_dir():
+                    with os.scandir(dataset_entry.path) as pickle_entries:
+                        pickle_paths = [pickle_entry.path.replace('\\', '/') for pickle_entry in pickle_entries]
+                    dataset_pickles_dict[dataset_entry.name] = pickle_paths
+                else: # if this is a single session instead...
+                    session_name = dataset_entry.name.rpartition('-')[0] # Select the portion before the last hyphen to drop the "-SessionData.pickle" portion.
+                    dataset_pickles_dict[session_name] = dataset_entry.path.replace('\\', '/')
         # Get dict keys
         dataset_dict_keys = list(dataset_pickles_dict.keys())
         return dataset_pickles_dict, dataset_dict_keys
@@ -100,6 +179,10 @@ class EMGSession(EMGData):
         - stim_interval (float): The stimulus interval (in s) in the EMG recordings.
         - emg_amp_gains (list): The amplifier gains for each channel in the EMG recordings.
         - recordings_raw (list): A list of dictionaries containing the raw EMG recordings.
+        - channel_data (ndarray): The raw EMG recordings stacked with shape (recordings, channels, samples), sorted by stimulus voltage.
+            If the recordings differ in shape (e.g. a truncated CSV export), this is instead a list of each recording's (channels, samples) array.
+        - stimulus_v (ndarray): The stimulus voltage of each recording in channel_data.
+        - channel_data_processed (ndarray): The processed EMG recordings stacked like channel_data (a list if channel_data is). The arrays in recordings_processed are views into it.
         - recordings_processed (list): A list of dictionaries containing the processed EMG recordings.
         - m_max (list): A list of M-wave amplitudes for each channel in the session.
 
@@ -110,6 +193,9 @@ class EMGSession(EMGData):
         session_parameters(): Prints EMG recording session parameters from a Pickle file.
     """
 
+    # Number of recordings filtered per call in process_emg_data.
+    _FILTER_BLOCK_SIZE = 32
+
     def __init__(self, pickled_data):
         """
         Initialize an EMGSession instance.
@@ -118,16 +204,26 @@ class EMGSession(EMGData):
             pickled_data (str): Filepath of the .pickle session data file for this session.
         """
         super().__init__()
-        self.plotter = EMGSessionPlotter(self)
+        self._plotter = None
         self.load_session_data(pickled_data)
         self._recordings_processed = None
+        self._channel_data_processed = None
         self._m_max = None
 
+    @property
+    def plotter(self):
+        """
+        The EMGSessionPlotter for this session, created on first use so sessions that are never plotted don't build one.
+        """
+        if self._plotter is None:
+            from Plot_EMG import EMGSessionPlotter
+            self._plotter = EMGSessionPlotter(self)
+        return self._plotter
+
     def load_session_data(self, pickled_data):
 
-        # Load the session data from the pickle file
-        with open(pickled_data, 'rb') as pickle_file:
-            session_data = pickle.load(pickle_file)
+        # Load the session data from the pickle file, read in one call.
+        session_data = pickle.loads(Path(pickled_data).read_bytes())
 
         # Access session-wide information
         session_info = session_data['session_info']
@@ -142,6 +238,64 @@ class EMGSession(EMGData):
 
         # Access the raw EMG recordings. Sort by stimulus voltage.
         self.recordings_raw = sorted(session_data['recordings'], key=lambda x: x['stimulus_v'])
+        self._stack_recordings()
+
+    def _stack_recordings(self):
+        """
+        Stores the raw recordings as contiguous arrays: channel_data with shape (recordings, channels, samples) and stimulus_v with shape (recordings,).
+        Each recording dict's 'channel_data' becomes a view into the stacked array, so both layouts share one copy of the data.
+        """
+        # Processing never copies the raw recordings, so lock the raw arrays against accidental in-place edits.
+        self.channel_data = self._stack_channel_data(self.recordings_raw, readonly=True)
+        if isinstance(self.channel_data, list) and self.channel_data:
+            expected_shape = self.channel_data[0].shape
+            i, recording_data = next((i, recording_data) for i, recording_data in enumerate(self.channel_data) if recording_data.shape != expected_shape)
+            print(f">! Warning: recordings in session {self.session_name} differ in shape (recording {i} at {self.recordings_raw[i]['stimulus_v']} V has shape {recording_data.shape}, "
+                  f"recording 0 has {expected_shape}). The recordings will be processed one at a time.")
+        self.stimulus_v = np.fromiter((recording['stimulus_v'] for recording in self.recordings_raw), dtype=float, count=len(self.recordings_raw))
+
+    @staticmethod
+    def _stack_channel_data(recordings, readonly=False):
+        """
+        Stacks the recordings' 'channel_data' into one (recordings, channels, samples) array and makes each recording's 'channel_data' a view into it.
+        Returns the stacked array, or a list of the recordings' arrays if there are no recordings or they differ in shape and can't be stacked.
+        """
+        recording_arrays = [np.asarray(recording['channel_data']) for recording in recordings]
+        if not recording_arrays or any(recording_array.shape != recording_arrays[0].shape for recording_array in recording_arrays):
+            for recording, recording_array in zip(recordings, recording_arrays):
+                if readonly:
+                    recording_array.setflags(write=False)
+                recording['channel_data'] = recording_array
+            return recording_arrays
+
+        channel_data = np.stack(recording_arrays)
+        if readonly:
+            # Lock before taking the views, so the views are read-only too.
+            channel_data.setflags(write=False)
+        for i, recording in enumerate(recordings):
+            recording['channel_data'] = channel_data[i]
+        return channel_data
+
+    def __getstate__(self):
+        # The stacked arrays are rebuilt on load, so don't pickle the raw data twice.
+        state = self.__dict__.copy()
+        state.pop('channel_data', None)
+        state.pop('stimulus_v', None)
+        state.pop('_channel_data_processed', None)
+        state['_plotter'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Sessions pickled before the plotter was created lazily carry an eager 'plotter' attribute; drop it.
+        state.pop('plotter', None)
+        state.setdefault('_plotter', None)
+        self.__dict__.update(state)
+        self._stack_recordings()
+        if self.__dict__.get('_recordings_processed') is not None:
+            self._channel_data_processed = self._stack_channel_data(self._recordings_processed)
+        else:
+            self._recordings_processed = None
+            self._channel_data_processed = None
     
     def process_emg_data(self, apply_filter=False, rectify=False):
         """
@@ -170,47 +324,82 @@ class EMGSession(EMGData):
             # Process EMG data with both bandpass filter and rectification applied
             processed_data = process_emg_data(apply_filter=True, rectify=True)
         """
-        def __process_single_recording(recording):
-            for i, channel_emg in enumerate(recording['channel_data']):
-                if apply_filter:
-                    filtered_emg = EMG_Transformer.butter_bandpass_filter(channel_emg, self.scan_rate, **self.butter_filter_args)
-                    if rectify:
-                        recording['channel_data'][i] = EMG_Transformer.rectify_emg(filtered_emg)
-                    else:
-                        recording['channel_data'][i] = filtered_emg
-                elif rectify:
-                    rectified_emg = EMG_Transformer.rectify_emg(channel_emg)
-                    recording['channel_data'][i] = rectified_emg
-                
+        if not apply_filter and not rectify:
+            return self.recordings_raw
+
+        return self._recordings_from_channel_data(self._process_channel_data(apply_filter, rectify))
+
+    def _process_channel_data(self, apply_filter, rectify):
+        """
+        Returns the raw recordings processed as in process_emg_data, as one (recordings, channels, samples) array
+        (or a list of per-recording arrays if the raw recordings couldn't be stacked).
+        """
+        if isinstance(self.channel_data, list):
+            # Recordings of different shapes can't be stacked, so process each one as a block of its own.
+            return [self._process_block(recording_data[np.newaxis], apply_filter, rectify)[0] for recording_data in self.channel_data]
+        return self._process_block(self.channel_data, apply_filter, rectify)
+
+    def _process_block(self, channel_data, apply_filter, rectify):
+        """
+        Processes a (recordings, channels, samples) array of raw recordings as in process_emg_data.
+        """
+        # Process the stacked (recordings, channels, samples) array so each step runs over many recordings at once.
+        emg_data = channel_data
+
+        if apply_filter:
+            # Filter blocks of recordings into one preallocated output, so the filter's padded float32 temporaries
+            # stay bounded by the block size instead of scaling with the whole session.
+            # Each block is also rectified and baseline-corrected while it is still in cache, rather than in later passes over the whole session.
+            emg_data = np.empty(channel_data.shape, dtype=np.float32)
+            for block_start in range(0, len(emg_data), self._FILTER_BLOCK_SIZE):
+                block = slice(block_start, block_start + self._FILTER_BLOCK_SIZE)
+                block_data = emg_data[block]
+                block_data[...] = EMG_Transformer.butter_bandpass_filter(channel_data[block], self.scan_rate, **self.butter_filter_args)
+                if rectify:
+                    EMG_Transformer.rectify_emg(block_data, out=block_data)
                 # Apply baseline correction to the processed data if a filter was applied.
-                if apply_filter:
-                    recording['channel_data'] = EMG_Transformer.correct_emg_to_baseline(recording['channel_data'], self.scan_rate, self.stim_delay)
-            return recording
-        
-        # Copy recordings if deep copy is needed.
-        processed_recordings = copy.deepcopy(self.recordings_raw) if apply_filter or rectify else self.recordings_raw
+                EMG_Transformer.correct_emg_to_baseline(block_data, self.scan_rate, self.stim_delay, inplace=True)
+        else:
+            emg_data = EMG_Transformer.rectify_emg(emg_data)
+        return emg_data
 
-        # Use ThreadPoolExecutor for parallel processing
-        with ThreadPoolExecutor() as executor:
-            processed_recordings = list(executor.map(__process_single_recording, processed_recordings))
+    def _recordings_from_channel_data(self, emg_data):
+        """
+        Returns recording dicts for a processed (recordings, channels, samples) array.
+        Each processed recording shares its stimulus info with the raw recording and views its slice of the processed array.
+        """
+        return [dict(recording, channel_data=emg_data[i]) for i, recording in enumerate(self.recordings_raw)]
 
-        return processed_recordings
+    @property
+    def channel_data_processed(self):
+        if self._channel_data_processed is None:
+            self._channel_data_processed = self._process_channel_data(apply_filter=True, rectify=False)
+        return self._channel_data_processed
 
     @property
     def recordings_processed (self):
         if self._recordings_processed is None:
-            self._recordings_processed = self.process_emg_data(apply_filter=True, rectify=False)
+            self._recordings_processed = self._recordings_from_channel_data(self.channel_data_processed)
         return self._recordings_processed
 
     @property
     def m_max(self):
         if self._m_max is None:
             m_max = []
-            
+
+            # Reduce each channel's M-wave window over all processed recordings at once.
+            emg_data = self.channel_data_processed
+            stimulus_voltages = self.stimulus_v
+
             for channel_idx in range(self.num_channels):
-                stimulus_voltages = [recording['stimulus_v'] for recording in self.recordings_processed]
-                m_wave_amplitudes = [EMG_Transformer.calculate_emg_amplitude(recording['channel_data'][channel_idx], self.m_start[channel_idx], self.m_end[channel_idx], self.scan_rate, method=self.default_method) for recording in self.recordings_processed]                
-                
+                start_index, end_index = EMG_Transformer.ms_to_idx(self.m_start[channel_idx], self.m_end[channel_idx], self.scan_rate)
+                if isinstance(emg_data, list):
+                    # Unstacked recordings of different shapes: reduce each recording's window on its own.
+                    m_wave_amplitudes = np.array([EMG_Transformer.calculate_window_amplitudes(recording_data[channel_idx, start_index:end_index], self.default_method)
+                                                  for recording_data in emg_data])
+                else:
+                    m_wave_amplitudes = EMG_Transformer.calculate_window_amplitudes(emg_data[:, channel_idx, start_index:end_index], self.default_method)
+
                 channel_mmax = EMG_Transformer.get_avg_mmax(stimulus_voltages, m_wave_amplitudes, mmax_report=False, **self.m_max_args)
                 m_max.append(channel_mmax)
             
@@ -233,15 +422,24 @@ class EMGSession(EMGData):
         """
         Opens a GUI to manually update the M-wave and H-reflex window settings for each channel.
         """
+        import tkinter as tk
+        from tkinter import ttk
+
         def save_settings():
+            windows_changed = False
             for i, (m_start_entry, m_end_entry, h_start_entry, h_end_entry) in enumerate(entry_fields):
                 try:
-                    self.m_start[i] = float(m_start_entry.get())
-                    self.m_end[i] = float(m_end_entry.get())
-                    self.h_start[i] = float(h_start_entry.get())
-                    self.h_end[i] = float(h_end_entry.get())
+                    channel_windows = (float(m_start_entry.get()), float(m_end_entry.get()), float(h_start_entry.get()), float(h_end_entry.get()))
                 except ValueError:
                     print(f"Invalid input for channel {i}. Skipping.")
+                    continue
+                # Leave channels whose windows were confirmed unchanged alone.
+                if channel_windows != (self.m_start[i], self.m_end[i], self.h_start[i], self.h_end[i]):
+                    self.m_start[i], self.m_end[i], self.h_start[i], self.h_end[i] = channel_windows
+                    windows_changed = True
+            # M-max depends on the M-wave windows, so only recalculate it if a window actually changed.
+            if windows_changed:
+                self._m_max = None
             window.destroy()
 
         window = tk.Tk()
@@ -290,14 +488,17 @@ class EMGSession(EMGData):
         """
         Prints EMG recording session parameters from a Pickle file.
         """
-        print(f"Session Name: {self.session_name}")
-        print(f"# of Channels: {self.num_channels}")
-        print(f"Scan rate (Hz): {self.scan_rate}")
-        print(f"Samples/Channel: {self.num_samples}")
-        print(f"Stimulus delay (ms): {self.stim_delay}")
-        print(f"Stimulus duration (ms): {self.stim_duration}")
-        print(f"Stimulus interval (s): {self.stim_interval}")
-        print(f"EMG amp gains: {self.emg_amp_gains}")
+        report = [
+            f"Session Name: {self.session_name}",
+            f"# of Channels: {self.num_channels}",
+            f"Scan rate (Hz): {self.scan_rate}",
+            f"Samples/Channel: {self.num_samples}",
+            f"Stimulus delay (ms): {self.stim_delay}",
+            f"Stimulus duration (ms): {self.stim_duration}",
+            f"Stimulus interval (s): {self.stim_interval}",
+            f"EMG amp gains: {self.emg_amp_gains}",
+        ]
+        print("\n".join(report))
 
     def plot(self, plot_type: str = None, channel_names: Optional[List[str]] = None, **kwargs):
         """
@@ -340,7 +541,11 @@ class EMGSession(EMGData):
         """
 
         # Call the appropriate plotting method from the plotter object
-        getattr(self.plotter, f'plot_{'emg' if not plot_type else plot_type}')(channel_names=channel_names, **kwargs)
+        plot_function = self.plotter.plot_map.get(plot_type or 'emg')
+        if plot_function is None:
+            print(f">! Error: plot type '{plot_type}' is not supported. Options are: {', '.join(self.plotter.plot_map)}.")
+            return
+        plot_function(channel_names=channel_names, **kwargs)
 
 class EMGDataset(EMGData):
     """
@@ -361,6 +566,12 @@ class EMGDataset(EMGData):
         - num_channels (int): The number of channels in the EMG recordings.
         - stim_delay (float): The stimulus delay from recording start (in ms) in the EMG recordings.
     """
+
+    # Buffer size for saving dataset pickles; much larger than the 8 KiB default, to cut down on small writes.
+    _PICKLE_BUFFER_SIZE = 1 << 20
+
+    # Maximum number of threads used to load session pickles when a dataset is built from file paths.
+    _MAX_LOAD_WORKERS = 8
     
     def __init__(self, emg_sessions, date, animal_id, condition, emg_sessions_to_exclude=[]):
         """
@@ -371,17 +582,20 @@ class EMGDataset(EMGData):
             emg_sessions_to_exclude (list, optional): A list of session names to exclude from the dataset. Defaults to an empty list.
         """
         super().__init__()
-        self.plotter = EMGDatasetPlotter(self)
+        self._plotter = None
         
         # Unpack the EMG sessions and exclude any sessions if needed.
         self.emg_sessions: List[EMGSession] = []
         self.emg_sessions = self.__unpackEMGSessions(emg_sessions) # Convert file location strings into a list of EMGSession instances.
         if len(emg_sessions_to_exclude) > 0:
             print(f"Excluding the following sessions from the dataset: {emg_sessions_to_exclude}")
-            self.emg_sessions = [session for session in self.emg_sessions if session.session_name not in emg_sessions_to_exclude]
+            sessions_to_exclude = frozenset(emg_sessions_to_exclude)
+            self.emg_sessions = [session for session in self.emg_sessions if session.session_name not in sessions_to_exclude]
             self._num_sessions_excluded = len(emg_sessions) - len(self.emg_sessions)
         else:
             self._num_sessions_excluded = 0
+        # The dataset's sessions keyed by name, for constant-time lookups when adding and removing sessions.
+        self._sessions_by_name = {session.session_name: session for session in self.emg_sessions}
 
         # Set dataset parameters
         self.date = date
@@ -397,6 +611,30 @@ class EMGDataset(EMGData):
             self.num_channels = self.emg_sessions[0].num_channels
             self.stim_delay = self.emg_sessions[0].stim_delay
 
+    @property
+    def plotter(self):
+        """
+        The EMGDatasetPlotter for this dataset, created on first use so datasets that are never plotted don't build one.
+        """
+        if self._plotter is None:
+            from Plot_EMG import EMGDatasetPlotter
+            self._plotter = EMGDatasetPlotter(self)
+        return self._plotter
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_plotter'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Datasets pickled before the plotter was created lazily carry an eager 'plotter' attribute; drop it.
+        state.pop('plotter', None)
+        state.setdefault('_plotter', None)
+        self.__dict__.update(state)
+        # Datasets pickled without the name-to-session lookup (e.g. by older versions) get it rebuilt from emg_sessions.
+        if '_sessions_by_name' not in state:
+            self._sessions_by_name = {session.session_name: session for session in self.emg_sessions}
+
     def __unpackEMGSessions(self, emg_sessions):
         """
         Unpacks a list of EMG session Pickle files and outputs a list of EMGSession instances for those pickles.
@@ -413,39 +651,57 @@ class EMGDataset(EMGData):
         """
         # Check if list dtype is EMGSession. If it is, convert it to a new EMGSession instance and replace the string in the list.
         pickled_sessions = []
+        session_paths = []
+        # File paths (str) are loaded into EMGSessions below; EMGSession instances are used as is.
+        targets = {str: session_paths, EMGSession: pickled_sessions}
         for session in emg_sessions:
-            if isinstance(session, str): # If list object is dtype(string), then convert to an EMGSession.
-                session = EMGSession(session) # replace the string with an actual session object.
-                pickled_sessions.append(session)
-            elif isinstance(session, EMGSession):
-                pickled_sessions.append(session)
-                print(session)
-            else:
-                raise TypeError(f"An object in the 'emg_sessions' list was not properly converted to an EMGSession. Object: {session}, {type(session)}")
+            target = targets.get(type(session))
+            if target is None:
+                # Fall back to isinstance for subclasses, e.g. numpy string scalars.
+                target = next((target for cls, target in targets.items() if isinstance(session, cls)), None)
+                if target is None:
+                    raise TypeError(f"An object in the 'emg_sessions' list was not properly converted to an EMGSession. Object: {session}, {type(session)}")
+            target.append(session)
+
+        # Each session reads its own pickle, so load them on a thread pool to overlap the file reads.
+        if len(session_paths) > 1:
+            _prefetch_files(session_paths)
+            with ThreadPoolExecutor(max_workers=min(self._MAX_LOAD_WORKERS, len(session_paths))) as executor:
+                pickled_sessions.extend(executor.map(EMGSession, session_paths))
+        else:
+            pickled_sessions.extend(EMGSession(session_path) for session_path in session_paths)
             
-            pickled_sessions = sorted(pickled_sessions, key=lambda x: x.session_name)
+        pickled_sessions.sort(key=attrgetter('session_name'))
         
         return pickled_sessions
 
-    def __check_session_consistency(self):
+    def __check_session_consistency(self, sessions_to_check=None):
         """
         Checks if all sessions in the dataset have the same parameters (scan rate, num_channels, stim_delay).
 
+        Args:
+            sessions_to_check (list, optional): The sessions to compare against the rest of the dataset. Defaults to all sessions.
+                When adding to a dataset that is already consistent, only the new session needs to be checked.
+
         Returns:
             tuple: A tuple containing a boolean value indicating whether all sessions have consistent parameters and a message indicating the result.
         """
-        reference_session = self.emg_sessions[0]
-        reference_scan_rate = reference_session.scan_rate
-        reference_num_channels = reference_session.num_channels
-        reference_stim_delay = reference_session.stim_delay
-
-        for session in self.emg_sessions[1:]:
-            if session.scan_rate != reference_scan_rate:
-                return False, f"Inconsistent scan_rate for {session.session_name}: {session.scan_rate} != {reference_scan_rate}."
-            if session.num_channels != reference_num_channels:
-                return False, f"Inconsistent num_channels for {session.session_name}: {session.num_channels} != {reference_num_channels}."
-            if session.stim_delay != reference_stim_delay:
-                return False, f"Inconsistent stim_delay for {session.session_name}: {session.stim_delay} != {reference_stim_delay}."
+        if sessions_to_check is None:
+            reference_session = self.emg_sessions[0]
+            sessions_to_check = self.emg_sessions[1:]
+        else:
+            # Compare against a session that is not itself being checked (a new session may have sorted to the front).
+            reference_session = next((session for session in self.emg_sessions if session not in sessions_to_check), self.emg_sessions[0])
+        # Compare all checked parameters as one tuple per session, and only work out which one differs on a mismatch.
+        parameter_names = ('scan_rate', 'num_channels', 'stim_delay')
+        get_parameters = attrgetter(*parameter_names)
+        reference_parameters = get_parameters(reference_session)
+
+        for session in sessions_to_check:
+            session_parameters = get_parameters(session)
+            if session_parameters != reference_parameters:
+                name, value, reference_value = next((name, value, reference_value) for name, value, reference_value in zip(parameter_names, session_parameters, reference_parameters) if value != reference_value)
+                return False, f"Inconsistent {name} for {session.session_name}: {value} != {reference_value}."
 
         return True, "All sessions have consistent parameters"
 
@@ -454,10 +710,13 @@ class EMGDataset(EMGData):
         Prints EMG dataset parameters.
         """
         session_names = [session.session_name for session in self.emg_sessions]
-        print(f"EMG Sessions ({len(self.emg_sessions)}): {session_names}.")
-        print(f"Date: {self.date}")
-        print(f"Animal ID: {self.animal_id}")
-        print(f"Condition: {self.condition}")
+        report = [
+            f"EMG Sessions ({len(self.emg_sessions)}): {session_names}",
+            f"Date: {self.date}",
+            f"Animal ID: {self.animal_id}",
+            f"Condition: {self.condition}",
+        ]
+        print("\n".join(report))
 
     def plot(self, plot_type: str = None, channel_names: Optional[List[str]] = None, **kwargs):
         """
@@ -490,7 +749,11 @@ class EMGDataset(EMGData):
         """
 
         # Call the appropriate plotting method from the plotter object
-        getattr(self.plotter, f'plot_{'reflexCurves' if not plot_type else plot_type}')(channel_names=channel_names, **kwargs)
+        plot_function = self.plotter.plot_map.get(plot_type or 'reflexCurves')
+        if plot_function is None:
+            print(f">! Error: plot type '{plot_type}' is not supported. Options are: {', '.join(self.plotter.plot_map)}.")
+            return
+        plot_function(channel_names=channel_names, **kwargs)
 
     # User methods for manipulating the EMGSession instances in the dataset.
     def add_session(self, session : Union[EMGSession, str]):
@@ -503,23 +766,21 @@ class EMGDataset(EMGData):
         Raises:
             TypeError: If the session is neither an instance of EMGSession nor a valid file path to a pickled EMGSession.
         """
-        if session in [session.session_name for session in self.emg_sessions]:
+        if not isinstance(session, EMGSession):
+            try:
+                session = EMGSession(session)
+            except:
+                raise TypeError("Expected an instance of EMGSession or a file path to a pickled EMGSession.")
+
+        if session.session_name in self._sessions_by_name:
             print(f">! Error: session {session.session_name} is already in the dataset.")
         else:
-            if isinstance(session, EMGSession):
-                # Add the session to the dataset.
-                self.emg_sessions.append(session)
-                self.emg_sessions = sorted(self.emg_sessions, key=lambda x: x.session_name)
-                
-            else:
-                try:
-                    self.emg_sessions.append(EMGSession(session))
-                except:
-                    raise TypeError("Expected an instance of EMGSession or a file path to a pickled EMGSession.")
+            # Add the session to the dataset.
+            bisect.insort(self.emg_sessions, session, key=lambda x: x.session_name)
+            self._sessions_by_name[session.session_name] = session
             
-            # Check that all sessions have the same parameters.
-            self.__check_session_consistency()
-            consistent, message = self.__check_session_consistency()
+            # Check that the new session has the same parameters as the rest of the dataset.
+            consistent, message = self.__check_session_consistency([session])
             if not consistent:
                 print(f"Error: {message}")
             else:
@@ -534,10 +795,11 @@ class EMGDataset(EMGData):
         Args:
             session_name (str): The name of the session to be removed.
         """
-        if session_name not in [session.session_name for session in self.emg_sessions]:
+        session = self._sessions_by_name.pop(session_name, None)
+        if session is None:
             print(f">! Error: session {session_name} not found in the dataset.")
         else:
-            self.emg_sessions = [session for session in self.emg_sessions if session.session_name != session_name]
+            self.emg_sessions.remove(session)
 
     def get_session(self, session_idx: int) -> EMGSession:
         """
@@ -545,6 +807,12 @@ class EMGDataset(EMGData):
         """
         return self.emg_sessions[session_idx]
 
+    def get_session_by_name(self, session_name: str) -> Optional[EMGSession]:
+        """
+        Returns the EMGSession object with the specified name, or None if the dataset has no such session.
+        """
+        return self._sessions_by_name.get(session_name)
+
     # Save and load the dataset object.
     def save_dataset(self, filename=None):
         """
@@ -556,8 +824,17 @@ class EMGDataset(EMGData):
         if filename is None:
             filename = f'{self.date} {self.animal_id} {self.condition} Dataset.pickle'
             
-        with open(filename, 'wb') as file:
-            pickle.dump(self, file)
+        # Write to a temporary file next to the target and swap it into place, so an interrupted save never leaves a truncated dataset behind.
+        temp_filename = f'{filename}.tmp'
+        try:
+            with open(temp_filename, 'wb', buffering=EMGDataset._PICKLE_BUFFER_SIZE) as file:
+                # Protocol 5+ writes the sessions' EMG arrays straight from their buffers instead of through intermediate bytes copies.
+                pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filename, filename)
+        except BaseException:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
 
     @staticmethod
     def load_dataset(filename):
@@ -570,8 +847,8 @@ class EMGDataset(EMGData):
         Returns:
             EMGDataset: The loaded dataset object.
         """
-        with open(filename, 'rb') as file:
-            dataset = pickle.load(file)
+        # Read the whole file in one call so the unpickler works from memory instead of refilling a file buffer.
+        dataset = pickle.loads(Path(filename).read_bytes())
         return dataset
     
     # Static methods for extracting information from dataset names and dataset dictionaries.
@@ -587,24 +864,11 @@ class EMGDataset(EMGData):
             tuple: A tuple containing the extracted information in the following order: (date, animal_id, condition).
                 If the dataset name does not match the expected format, returns (None, None, None).
         """
-        # Define the regex pattern
-        pattern = r'^(\d{6})\s([A-Z]\d+\.\d)\s(.+)$'
-        
-        # Match the pattern
-        match = re.match(pattern, dataset_name)
-        
-        if match:
-            date = match.group(1)
-            animal_id = match.group(2)
-            condition = match.group(3)
-            
-            # Convert the date to "yyyy-mm-dd"
-            date = datetime.strptime(date, '%y%m%d').strftime('%Y-%m-%d')
-            
-            return date, animal_id, condition
-        else:
+        dataset_info = _parse_dataset_name(dataset_name)
+        if dataset_info is None:
             print(f"Error: Dataset name {dataset_name} does not match the expected format: '[YYMMDD] [AnimalID] [Condition]'.")
             return None, None, None
+        return dataset_info
 
     @classmethod
     def dataset_from_dataset_dict(cls, dataset_dict: dict, datasets: List[str], dataset_idx: int, emg_sessions_to_exclude: List[str] = []) -> 'EMGDataset':
@@ -13,28 +13,49 @@ Additionally, it includes a function for calculating the mean and standard devia
 over multiple sessions, given specific parameters.
 
 Functions:
-- butter_bandpass: Butterworth bandpass filter design.
+- butter_bandpass: Butterworth bandpass filter design (cached, second-order sections).
 - butter_bandpass_filter: Apply Butterworth bandpass filter to data.
 - correct_emg_to_baseline: Correct EMG data relative to pre-stimulus baseline amplitude.
 - rectify_emg: Rectify EMG data by taking the absolute value.
+- ms_to_idx: Convert a window in milliseconds to sample indices.
 - calculate_average_amplitude_rectified: Calculate the average rectified EMG amplitude between start and end times.
 - calculate_peak_to_trough_amplitude: Calculate the peak-to-trough EMG amplitude between start and end times.
 - calculate_rms_amplitude: Calculate the average RMS EMG amplitude between start and end times.
 - calculate_average_amplitude_unrectified: Calculate the average unrectified EMG amplitude between start and end times.
+- calculate_emg_amplitude_idx: Calculate an EMG amplitude for a window given in sample indices.
+- calculate_window_amplitudes: Calculate the EMG amplitude of each row of a 2-D array of equal-length windows.
+- group_recordings_by_bin: Group recordings by binned stimulus voltage.
+- calculate_binned_amplitudes: Calculate the M-wave and H-reflex amplitudes of all recordings in a stimulus voltage bin.
+- calculate_mean_std: Calculate the mean and standard deviation of M-wave and H-reflex amplitudes in a stimulus voltage bin.
 - savgol_filter_y: Smoothen the data using Savitzky-Golay filtering.
 - detect_plateau: Detect the plateau region in a reflex curve.
 - get_avg_mmax: Get the M-wave amplitude and stimulus voltage at M-max. 
 
 Note: This module requires the numpy and scipy libraries to be installed.
+If numba is installed, the window reductions run as compiled single-pass kernels; otherwise they fall back to numpy.
 """
 
+from functools import lru_cache
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy import signal
 
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+@lru_cache(maxsize=32)
 def butter_bandpass(lowcut, highcut, fs, order):
     """
     Design a Butterworth bandpass filter.
 
+    The design is cached per (lowcut, highcut, fs, order), so repeated calls with the same
+    filter settings return the same coefficient array without redesigning the filter;
+    callers must not modify the returned array in place.
+
     Parameters:
     lowcut (float): The lower cutoff frequency of the filter.
     highcut (float): The upper cutoff frequency of the filter.
@@ -42,22 +63,21 @@ def butter_bandpass(lowcut, highcut, fs, order):
     order (int): The order of the filter.
 
     Returns:
-    b (ndarray): The numerator coefficients of the filter transfer function.
-    a (ndarray): The denominator coefficients of the filter transfer function.
+    sos (ndarray): The second-order sections representation of the filter.
     """
     nyquist = 0.5 * fs
     low = lowcut / nyquist
     high = highcut / nyquist
-    b, a = signal.butter(order, [low, high], btype='band')
-    return b, a
+    sos = signal.butter(order, [low, high], btype='band', output='sos')
+    return sos
 
-def butter_bandpass_filter(data, fs, lowcut=100, highcut=3500, order=4):
+def butter_bandpass_filter(data, fs, lowcut=100, highcut=3500, order=4, dtype=np.float32):
     """
     Apply a Butterworth bandpass filter to the input data.
 
     Parameters:
     - data: array-like
-        The input data to be filtered.
+        The input data to be filtered, along its last axis.
     - fs: float
         The sampling frequency of the input data.
     - lowcut: float, optional
@@ -66,40 +86,160 @@ def butter_bandpass_filter(data, fs, lowcut=100, highcut=3500, order=4):
         The upper cutoff frequency of the bandpass filter (default: 3500 Hz).
     - order: int, optional
         The order of the Butterworth filter (default: 4).
+    - dtype: numpy dtype, optional
+        The precision the filter runs in and returns (default: np.float32). Single precision is ample for EMG
+        and halves the memory traffic of the forward-backward pass; pass np.float64 if full precision is needed.
 
     Returns:
-    - y: array-like
+    - y: ndarray (dtype)
         The filtered data.
     """
-    b, a = butter_bandpass(lowcut, highcut, fs, order)
-    y = signal.filtfilt(b, a, data)
+    data = np.ascontiguousarray(data, dtype=dtype)
+    sos = butter_bandpass(lowcut, highcut, fs, order).astype(dtype)
+    y = signal.sosfiltfilt(sos, data).astype(dtype, copy=False)
     return y
 
-def correct_emg_to_baseline(recording, scan_rate, stim_delay):
+def correct_emg_to_baseline(recording, scan_rate, stim_delay, inplace=False):
     """
     Corrects EMG absolute amplitude relative to pre-stim baseline amplitude.
 
     Parameters:
-    recording (list): A list of EMG channel data.
+    recording (array-like): EMG channel data with shape (num_channels, num_samples), or any array whose last axis is samples
+        (e.g. (num_recordings, num_channels, num_samples)).
     scan_rate (float): The scan rate of the EMG recording.
     stim_delay (float): The delay between the start of the recording and the stimulation.
+    inplace (bool, optional): Whether to subtract the baseline in place when recording is already a float ndarray,
+        instead of allocating a corrected copy. Defaults to False.
 
     Returns:
-    list: A list of EMG channel data with the baseline amplitude corrected.
+    ndarray: EMG channel data with the baseline amplitude of each channel subtracted, in the same shape as recording.
     """
-    adjusted_recording = []
-    for channel in recording:
-        baseline_emg = _calculate_average_amplitude_unrectified(channel, 0, stim_delay, scan_rate)
-        adjusted_channel = channel - baseline_emg
-        adjusted_recording.append(adjusted_channel)
+    recording = np.asarray(recording)
+    _, baseline_end = ms_to_idx(0, stim_delay, scan_rate)
+    baseline_emg = recording[..., :baseline_end].mean(axis=-1, keepdims=True)
+    if inplace:
+        recording -= baseline_emg
+        return recording
+    return recording - baseline_emg
+
+def rectify_emg(emg_array, out=None):
+    """
+    Rectify EMG data by taking the absolute value.
 
-    return adjusted_recording
+    Pass out=emg_array to rectify in place instead of allocating a new array.
+    """
+    return np.abs(emg_array, out=out)
 
-def rectify_emg(emg_array):
+def _kernel_array(emg_data):
     """
-    Rectify EMG data by taking the absolute value.
+    Return emg_data as a C-contiguous float32 or float64 array, so the window kernels compile at most one specialization per dtype.
+    """
+    emg_data = np.asarray(emg_data)
+    if emg_data.dtype != np.float32:
+        emg_data = emg_data.astype(np.float64, copy=False)
+    return np.ascontiguousarray(emg_data)
+
+if NUMBA_AVAILABLE:
+    # The kernels compile on first use (and are cached on disk), so importing this module stays cheap for code that never calls them.
+    # Only reassociation and contraction are allowed: unlike full fastmath, they keep NaN and infinity semantics,
+    # so a NaN in the window propagates to the result as it does in the numpy fallbacks.
+    _FASTMATH_FLAGS = {'reassoc', 'contract'}
+
+    @njit(cache=True, fastmath=_FASTMATH_FLAGS)
+    def _abs_mean(x, i0, i1):
+        """Mean of |x[i0:i1]| in a single pass."""
+        i0 = max(i0, 0)
+        i1 = min(i1, x.shape[0])
+        if i1 <= i0:
+            return np.nan
+        total = 0.0
+        for k in range(i0, i1):
+            total += abs(x[k])
+        return total / (i1 - i0)
+
+    @njit(cache=True, fastmath=_FASTMATH_FLAGS)
+    def _rms(x, i0, i1):
+        """Root mean square of x[i0:i1] in a single pass."""
+        i0 = max(i0, 0)
+        i1 = min(i1, x.shape[0])
+        if i1 <= i0:
+            return np.nan
+        total = 0.0
+        for k in range(i0, i1):
+            total += x[k] * x[k]
+        return np.sqrt(total / (i1 - i0))
+
+    @njit(cache=True, fastmath=_FASTMATH_FLAGS)
+    def _peak_to_trough(x, i0, i1):
+        """max(x[i0:i1]) - min(x[i0:i1]) in a single pass."""
+        i0 = max(i0, 0)
+        i1 = min(i1, x.shape[0])
+        if i1 <= i0:
+            return np.nan
+        peak = x[i0]
+        trough = x[i0]
+        for k in range(i0, i1):
+            value = x[k]
+            # Comparisons with NaN are always false, so catch it explicitly to propagate it as np.max/np.min do.
+            if np.isnan(value):
+                return np.nan
+            if value > peak:
+                peak = value
+            elif value < trough:
+                trough = value
+        return peak - trough
+
+    @njit(cache=True, fastmath=_FASTMATH_FLAGS)
+    def _mean(x, i0, i1):
+        """Mean of x[i0:i1] in a single pass."""
+        i0 = max(i0, 0)
+        i1 = min(i1, x.shape[0])
+        if i1 <= i0:
+            return np.nan
+        total = 0.0
+        for k in range(i0, i1):
+            total += x[k]
+        return total / (i1 - i0)
+else:
+    # The fallbacks return Python floats, like the compiled kernels, rather than 0-d NumPy scalars, and accumulate means in float64.
+    # Like the kernels, they clamp the window to the trace and return nan for an empty window.
+    def _abs_mean(x, i0, i1):
+        """Mean of |x[i0:i1]|."""
+        emg_window = x[max(i0, 0):max(i1, 0)]
+        if emg_window.size == 0:
+            return np.nan
+        return float(np.mean(np.abs(emg_window), dtype=np.float64))
+
+    def _rms(x, i0, i1):
+        """Root mean square of x[i0:i1]."""
+        emg_window = x[max(i0, 0):max(i1, 0)]
+        if emg_window.size == 0:
+            return np.nan
+        # einsum sums the squares (in float64) without allocating a squared copy of the window.
+        return float(np.sqrt(np.einsum('i,i->', emg_window, emg_window, dtype=np.float64) / emg_window.size))
+
+    def _peak_to_trough(x, i0, i1):
+        """max(x[i0:i1]) - min(x[i0:i1])."""
+        emg_window = x[max(i0, 0):max(i1, 0)]
+        if emg_window.size == 0:
+            return np.nan
+        return float(np.max(emg_window) - np.min(emg_window))
+
+    def _mean(x, i0, i1):
+        """Mean of x[i0:i1]."""
+        emg_window = x[max(i0, 0):max(i1, 0)]
+        if emg_window.size == 0:
+            return np.nan
+        return float(np.mean(emg_window, dtype=np.float64))
+
+def ms_to_idx(start_ms, end_ms, scan_rate):
+    """
+    Convert a window in milliseconds to (start_index, end_index) sample indices.
+
+    Indices are truncated with int(), so a window boundary between two samples falls on the earlier one. This matches how
+    windows have always been sliced here; rounding to the nearest sample would shift existing amplitudes.
     """
-    return np.abs(emg_array)
+    return int(start_ms * scan_rate / 1000), int(end_ms * scan_rate / 1000)
 
 def _calculate_average_amplitude_rectified(emg_data, start_ms, end_ms, scan_rate):
     """
@@ -119,11 +259,8 @@ def _calculate_average_amplitude_rectified(emg_data, start_ms, end_ms, scan_rate
     - average_amplitude: float
         The average rectified EMG amplitude between start_ms and end_ms.
     """
-    start_index = int(start_ms * scan_rate / 1000)
-    end_index = int(end_ms * scan_rate / 1000)
-    emg_window = emg_data[start_index:end_index]
-    rectified_emg_window = rectify_emg(emg_window)
-    return np.mean(rectified_emg_window)
+    start_index, end_index = ms_to_idx(start_ms, end_ms, scan_rate)
+    return _abs_mean(_kernel_array(emg_data), start_index, end_index)
 
 def _calculate_peak_to_trough_amplitude(emg_data, start_ms, end_ms, scan_rate):
     """
@@ -144,42 +281,20 @@ def _calculate_peak_to_trough_amplitude(emg_data, start_ms, end_ms, scan_rate):
         The peak-to-trough amplitude of the EMG data between start_ms and end_ms.
     """
     # Convert start and end times from milliseconds to sample indices
-    start_index = int(start_ms * scan_rate / 1000)
-    end_index = int(end_ms * scan_rate / 1000)
-    
-    # Extract the relevant window of EMG data
-    emg_window = emg_data[start_index:end_index]
-    
-    # Find the peak (maximum) and trough (minimum) values in the window
-    peak_value = np.max(emg_window)
-    trough_value = np.min(emg_window)
+    start_index, end_index = ms_to_idx(start_ms, end_ms, scan_rate)
     
-    # Calculate the peak-to-trough amplitude
-    peak_to_trough_amplitude = peak_value - trough_value
-    
-    return peak_to_trough_amplitude
+    # Find the peak (maximum) and trough (minimum) values of the window in a single pass
+    return _peak_to_trough(_kernel_array(emg_data), start_index, end_index)
 
 def _calculate_rms_amplitude(emg_data, start_ms, end_ms, scan_rate):
     """
     Calculate the average RMS EMG amplitude between start_ms and end_ms.
     """
     # Convert start and end times from milliseconds to sample indices
-    start_index = int(start_ms * scan_rate / 1000)
-    end_index = int(end_ms * scan_rate / 1000)
-    
-    # Extract the relevant window of EMG data
-    emg_window = emg_data[start_index:end_index]
-    
-    # Square each value in the EMG window
-    squared_emg_window = np.square(emg_window)
+    start_index, end_index = ms_to_idx(start_ms, end_ms, scan_rate)
     
-    # Calculate the mean of the squared values
-    mean_squared_value = np.mean(squared_emg_window)
-    
-    # Take the square root of the mean squared value to get the RMS
-    rms_value = np.sqrt(mean_squared_value)
-    
-    return rms_value
+    # Square, average and take the root of the EMG window in a single pass
+    return _rms(_kernel_array(emg_data), start_index, end_index)
 
 def _calculate_average_amplitude_unrectified(emg_data, start_ms, end_ms, scan_rate):
     """
@@ -194,11 +309,8 @@ def _calculate_average_amplitude_unrectified(emg_data, start_ms, end_ms, scan_ra
     Returns:
     - average_amplitude (float): The average unrectified EMG amplitude.
     """
-    start_index = int(start_ms * scan_rate / 1000)
-    end_index = int(end_ms * scan_rate / 1000)
-    emg_window = emg_data[start_index:end_index]
-    rectified_emg_window = emg_window
-    return np.mean(rectified_emg_window)
+    start_index, end_index = ms_to_idx(start_ms, end_ms, scan_rate)
+    return _mean(_kernel_array(emg_data), start_index, end_index)
 
 def calculate_emg_amplitude(emg_data, start_ms, end_ms, scan_rate, method):
     """
@@ -221,27 +333,355 @@ def calculate_emg_amplitude(emg_data, start_ms, end_ms, scan_rate, method):
     - amplitude: float
         The calculated EMG amplitude based on the specified method.
     """
-    methods = {
-        'average_rectified': _calculate_average_amplitude_rectified,
-        'peak_to_trough': _calculate_peak_to_trough_amplitude,
-        'rms': _calculate_rms_amplitude,
-        'average_unrectified': _calculate_average_amplitude_unrectified,
+    # Convert the window to sample indices once, then dispatch on the method.
+    start_index, end_index = ms_to_idx(start_ms, end_ms, scan_rate)
+    return calculate_emg_amplitude_idx(emg_data, start_index, end_index, method)
+
+def calculate_emg_amplitude_idx(emg_data, start_index, end_index, method):
+    """
+    Calculate the EMG amplitude using the specified method, with the window given as sample indices.
+
+    Use this instead of calculate_emg_amplitude in loops over recordings, so the millisecond-to-sample
+    conversion is done once per window rather than once per recording.
+
+    Parameters:
+    - emg_data: numpy array
+        The EMG data.
+    - start_index, end_index: int
+        The window in samples.
+    - method: str
+        The calculation method to use. Must be one of 'average_rectified',
+        'peak_to_trough', 'rms', or 'average_unrectified'.
+
+    Returns:
+    - amplitude: float
+        The calculated EMG amplitude based on the specified method.
+    """
+    kernels = {
+        'average_rectified': _abs_mean,
+        'peak_to_trough': _peak_to_trough,
+        'rms': _rms,
+        'average_unrectified': _mean,
     }
 
-    if method not in methods:
-        raise ValueError(f"Invalid method '{method}'. Must be one of {', '.join(methods.keys())}")
+    if method not in kernels:
+        raise ValueError(f"Invalid method '{method}'. Must be one of {', '.join(kernels.keys())}")
+
+    return kernels[method](_kernel_array(emg_data), start_index, end_index)
+
+def calculate_window_amplitudes(emg_windows, method):
+    """
+    Calculate the EMG amplitude of each row of a 2-D array of equal-length windows with one vectorized reduction.
 
-    calculation_function = methods[method]
-    amplitude = calculation_function(emg_data, start_ms, end_ms, scan_rate)
+    Parameters:
+    - emg_windows (ndarray): EMG windows with shape (num_windows, window_samples).
+    - method (str): 'average_rectified', 'peak_to_trough', 'rms', or 'average_unrectified'.
 
-    return amplitude
+    Returns:
+    - ndarray: The amplitude of each window (float64).
+    """
+    if method == 'rms':
+        # einsum sums each window's squares (in float64) without allocating a squared copy of the windows.
+        return np.sqrt(np.einsum('...i,...i->...', emg_windows, emg_windows, dtype=np.float64) / emg_windows.shape[-1])
+    elif method == 'average_rectified':
+        return np.mean(np.abs(emg_windows), axis=-1, dtype=np.float64)
+    elif method == 'peak_to_trough':
+        return (np.max(emg_windows, axis=-1) - np.min(emg_windows, axis=-1)).astype(np.float64)
+    elif method == 'average_unrectified':
+        return np.mean(emg_windows, axis=-1, dtype=np.float64)
+    else:
+        raise ValueError(f"Invalid method '{method}'. Must be one of average_rectified, peak_to_trough, rms, average_unrectified")
+
+# Integer ids for the batch amplitude methods, so the compiled batch kernel can dispatch in nopython mode.
+# The names match calculate_emg_amplitude; 'avg_rectified' is kept as an alias of 'average_rectified' for the plotters' older name.
+_BATCH_METHOD_IDS = {'rms': 0, 'average_rectified': 1, 'peak_to_trough': 2, 'average_unrectified': 3, 'avg_rectified': 1}
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=_FASTMATH_FLAGS)
+    def _window_amplitude(x, i0, i1, method_id):
+        """Amplitude of x[i0:i1] for the given batch method id."""
+        i0 = max(i0, 0)
+        i1 = min(i1, x.shape[0])
+        if i1 <= i0:
+            return np.nan
+        if method_id == 0:
+            total = 0.0
+            for k in range(i0, i1):
+                total += x[k] * x[k]
+            return np.sqrt(total / (i1 - i0))
+        elif method_id == 1:
+            total = 0.0
+            for k in range(i0, i1):
+                total += abs(x[k])
+            return total / (i1 - i0)
+        elif method_id == 2:
+            peak = x[i0]
+            trough = x[i0]
+            for k in range(i0, i1):
+                value = x[k]
+                if np.isnan(value):
+                    return np.nan
+                if value > peak:
+                    peak = value
+                elif value < trough:
+                    trough = value
+            return peak - trough
+        else:
+            total = 0.0
+            for k in range(i0, i1):
+                total += x[k]
+            return total / (i1 - i0)
+
+    @njit(parallel=True, cache=True, fastmath=_FASTMATH_FLAGS)
+    def _batch_amplitudes(traces, m_i0, m_i1, h_i0, h_i1, method_id):
+        """M-wave and H-reflex amplitudes of each row of traces, computed in parallel over rows."""
+        num_traces = traces.shape[0]
+        m_wave_amplitudes = np.empty(num_traces)
+        h_response_amplitudes = np.empty(num_traces)
+        for n in prange(num_traces):
+            m_wave_amplitudes[n] = _window_amplitude(traces[n], m_i0, m_i1, method_id)
+            h_response_amplitudes[n] = _window_amplitude(traces[n], h_i0, h_i1, method_id)
+        return m_wave_amplitudes, h_response_amplitudes
+
+    @njit(parallel=True, cache=True, fastmath=_FASTMATH_FLAGS)
+    def _batch_mean_std(traces, m_i0, m_i1, h_i0, h_i1, method_id, num_chunks):
+        """
+        (m_mean, m_std, h_mean, h_std) of the amplitudes of the rows of traces without storing them.
+
+        Each chunk of rows keeps a Welford (count, mean, M2) accumulator in parallel; the chunks are then
+        merged with the pairwise combine formula. Standard deviations are population (ddof=0), as np.std.
+        """
+        num_traces = traces.shape[0]
+        chunk_size = (num_traces + num_chunks - 1) // num_chunks
+        counts = np.zeros(num_chunks)
+        m_means = np.zeros(num_chunks)
+        m_m2s = np.zeros(num_chunks)
+        h_means = np.zeros(num_chunks)
+        h_m2s = np.zeros(num_chunks)
+        for c in prange(num_chunks):
+            count = 0.0
+            m_mean = 0.0
+            m_m2 = 0.0
+            h_mean = 0.0
+            h_m2 = 0.0
+            for n in range(c * chunk_size, min((c + 1) * chunk_size, num_traces)):
+                count += 1.0
+                m_amplitude = _window_amplitude(traces[n], m_i0, m_i1, method_id)
+                delta = m_amplitude - m_mean
+                m_mean += delta / count
+                m_m2 += delta * (m_amplitude - m_mean)
+                h_amplitude = _window_amplitude(traces[n], h_i0, h_i1, method_id)
+                delta = h_amplitude - h_mean
+                h_mean += delta / count
+                h_m2 += delta * (h_amplitude - h_mean)
+            counts[c] = count
+            m_means[c] = m_mean
+            m_m2s[c] = m_m2
+            h_means[c] = h_mean
+            h_m2s[c] = h_m2
+
+        count = 0.0
+        m_mean = 0.0
+        m_m2 = 0.0
+        h_mean = 0.0
+        h_m2 = 0.0
+        for c in range(num_chunks):
+            if counts[c] == 0.0:
+                continue
+            total = count + counts[c]
+            delta = m_means[c] - m_mean
+            m_mean += delta * counts[c] / total
+            m_m2 += m_m2s[c] + delta * delta * count * counts[c] / total
+            delta = h_means[c] - h_mean
+            h_mean += delta * counts[c] / total
+            h_m2 += h_m2s[c] + delta * delta * count * counts[c] / total
+            count = total
+        if count == 0.0:
+            return np.nan, np.nan, np.nan, np.nan
+        return m_mean, np.sqrt(m_m2 / count), h_mean, np.sqrt(h_m2 / count)
+else:
+    def _batch_rms_amplitude(emg_windows):
+        """RMS amplitude of each row of a 2-D array of EMG windows."""
+        # einsum sums each row's squares (in float64) without allocating a squared copy of the windows.
+        return np.sqrt(np.einsum('ij,ij->i', emg_windows, emg_windows, dtype=np.float64) / emg_windows.shape[1])
+
+    def _batch_average_amplitude_rectified(emg_windows):
+        """Average rectified amplitude of each row of a 2-D array of EMG windows."""
+        return np.mean(np.abs(emg_windows), axis=1, dtype=np.float64)
+
+    def _batch_peak_to_trough_amplitude(emg_windows):
+        """Peak-to-trough amplitude of each row of a 2-D array of EMG windows."""
+        return (np.max(emg_windows, axis=1) - np.min(emg_windows, axis=1)).astype(np.float64)
+
+    def _batch_average_amplitude_unrectified(emg_windows):
+        """Average unrectified amplitude of each row of a 2-D array of EMG windows."""
+        return np.mean(emg_windows, axis=1, dtype=np.float64)
+
+    def _batch_window_amplitudes(traces, i0, i1, method_id):
+        """Amplitude of each row of traces[:, i0:i1], clamped to the traces and nan for an empty window, as in the compiled kernel."""
+        emg_windows = traces[:, max(i0, 0):max(i1, 0)]
+        if emg_windows.shape[1] == 0:
+            return np.full(traces.shape[0], np.nan)
+        return (_batch_rms_amplitude, _batch_average_amplitude_rectified, _batch_peak_to_trough_amplitude, _batch_average_amplitude_unrectified)[method_id](emg_windows)
+
+    def _batch_amplitudes(traces, m_i0, m_i1, h_i0, h_i1, method_id):
+        """M-wave and H-reflex amplitudes of each row of traces."""
+        return _batch_window_amplitudes(traces, m_i0, m_i1, method_id), _batch_window_amplitudes(traces, h_i0, h_i1, method_id)
+
+    def _batch_mean_std(traces, m_i0, m_i1, h_i0, h_i1, method_id, num_chunks):
+        """(m_mean, m_std, h_mean, h_std) of the amplitudes of the rows of traces."""
+        m_wave_amplitudes, h_response_amplitudes = _batch_amplitudes(traces, m_i0, m_i1, h_i0, h_i1, method_id)
+        return np.mean(m_wave_amplitudes), np.std(m_wave_amplitudes), np.mean(h_response_amplitudes), np.std(h_response_amplitudes)
+
+def group_recordings_by_bin(recordings, bin_size):
+    """
+    Group recordings by binned stimulus voltage in a single scan.
+
+    Parameters:
+    - recordings (list): Recording dicts with a 'stimulus_v' key.
+    - bin_size (float): The stimulus voltage bin size.
+
+    Returns:
+    - dict: Maps each binned stimulus voltage to the list of indices of its recordings.
+    """
+    bin_groups = {}
+    for i, recording in enumerate(recordings):
+        bin_groups.setdefault(round(recording['stimulus_v'] / bin_size) * bin_size, []).append(i)
+    return bin_groups
+
+def _prepare_binned_traces(recordings, stimulus_value, bin_size, channel_index, m_start_ms, m_end_ms, h_start_ms, h_end_ms, scan_rate, method, bin_groups=None):
+    """
+    Validate the method and return (method_id, m_start_index, m_end_index, h_start_index, h_end_index, traces)
+    for the recordings in a binned stimulus voltage. traces is None if no recordings fall in the bin.
+
+    traces is normally one 2-D array with a row per recording. Recordings from sessions with different numbers of samples
+    can't be stacked, so in that case traces is a list with a one-row 2-D array per recording instead.
+    """
+    if method not in _BATCH_METHOD_IDS:
+        raise ValueError(f"Invalid method '{method}'. Must be one of {', '.join(_BATCH_METHOD_IDS.keys())}")
+
+    method_id = _BATCH_METHOD_IDS[method]
+
+    m_start_index, m_end_index = ms_to_idx(m_start_ms, m_end_ms, scan_rate)
+    h_start_index, h_end_index = ms_to_idx(h_start_ms, h_end_ms, scan_rate)
+
+    if bin_groups is not None:
+        indices = bin_groups.get(stimulus_value, [])
+    else:
+        stimulus_v = np.array([recording['stimulus_v'] for recording in recordings])
+        indices = np.flatnonzero(np.round(stimulus_v / bin_size) * bin_size == stimulus_value)
+    if len(indices) == 0:
+        # No recordings in this bin.
+        return method_id, m_start_index, m_end_index, h_start_index, h_end_index, None
+    channel_traces = [recordings[i]['channel_data'][channel_index] for i in indices]
+    if len({len(trace) for trace in channel_traces}) > 1:
+        traces = [_kernel_array(trace)[np.newaxis] for trace in channel_traces]
+    else:
+        traces = _kernel_array(np.stack(channel_traces))
+
+    return method_id, m_start_index, m_end_index, h_start_index, h_end_index, traces
+
+def _unstacked_batch_amplitudes(traces, m_i0, m_i1, h_i0, h_i1, method_id):
+    """
+    _batch_amplitudes for a list of one-row trace arrays of different lengths, with the amplitudes joined in order.
+    """
+    amplitudes = [_batch_amplitudes(trace, m_i0, m_i1, h_i0, h_i1, method_id) for trace in traces]
+    return np.concatenate([m_wave for m_wave, _ in amplitudes]), np.concatenate([h_response for _, h_response in amplitudes])
+
+def calculate_binned_amplitudes(recordings, stimulus_value, bin_size, channel_index, m_start_ms, m_end_ms, h_start_ms, h_end_ms, scan_rate, method='rms', bin_groups=None):
+    """
+    Calculate the M-wave and H-reflex amplitudes of every recording in a binned stimulus voltage.
+
+    The matching channel traces are stacked into a single 2-D array and the amplitudes of all recordings
+    in the bin are computed in one batch (in parallel over recordings when numba is available). If the recordings
+    differ in length (sessions with different numbers of samples), each recording is measured on its own.
+
+    Parameters:
+    - recordings (list): Recording dicts with 'stimulus_v' and 'channel_data' keys.
+    - stimulus_value (float): The binned stimulus voltage to select recordings for.
+    - bin_size (float): The stimulus voltage bin size.
+    - channel_index (int): The channel to calculate amplitudes for.
+    - m_start_ms, m_end_ms (float): The M-wave window in milliseconds from the start of the recording.
+    - h_start_ms, h_end_ms (float): The H-reflex window in milliseconds from the start of the recording.
+    - scan_rate (int): The scan rate in samples per second.
+    - method (str): 'rms', 'average_rectified' (or 'avg_rectified'), 'peak_to_trough', or 'average_unrectified'.
+    - bin_groups (dict, optional): Output of group_recordings_by_bin for these recordings. When building a curve over many bins,
+        pass it to look up each bin's recordings directly instead of re-binning every recording on each call.
+
+    Returns:
+    - tuple: (m_wave_amplitudes, h_response_amplitudes) arrays, empty if no recordings fall in the bin.
+
+    Raises:
+    - ValueError: If the method is not supported.
+    """
+    method_id, m_start_index, m_end_index, h_start_index, h_end_index, traces = _prepare_binned_traces(
+        recordings, stimulus_value, bin_size, channel_index, m_start_ms, m_end_ms, h_start_ms, h_end_ms, scan_rate, method, bin_groups)
+    if traces is None:
+        return np.array([]), np.array([])
+    if isinstance(traces, list):
+        return _unstacked_batch_amplitudes(traces, m_start_index, m_end_index, h_start_index, h_end_index, method_id)
+    return _batch_amplitudes(traces, m_start_index, m_end_index, h_start_index, h_end_index, method_id)
+
+def calculate_mean_std(recordings, stimulus_value, bin_size, channel_index, m_start_ms, m_end_ms, h_start_ms, h_end_ms, scan_rate, method='rms', bin_groups=None):
+    """
+    Calculate the mean and standard deviation of the M-wave and H-reflex amplitudes in a binned stimulus voltage.
+
+    Takes the same parameters as calculate_binned_amplitudes. When numba is available the statistics are
+    accumulated in a single parallel pass (Welford) without materializing the per-recording amplitudes.
+
+    Returns:
+    - tuple: (m_wave_mean, m_wave_std, h_response_mean, h_response_std), all NaN if no recordings fall in the bin.
+
+    Raises:
+    - ValueError: If the method is not supported.
+    """
+    method_id, m_start_index, m_end_index, h_start_index, h_end_index, traces = _prepare_binned_traces(
+        recordings, stimulus_value, bin_size, channel_index, m_start_ms, m_end_ms, h_start_ms, h_end_ms, scan_rate, method, bin_groups)
+    if traces is None:
+        return np.nan, np.nan, np.nan, np.nan
+    if isinstance(traces, list):
+        # Recordings of different lengths can't go through the single-pass batch kernel; reduce their amplitudes instead.
+        m_wave_amplitudes, h_response_amplitudes = _unstacked_batch_amplitudes(traces, m_start_index, m_end_index, h_start_index, h_end_index, method_id)
+        return np.mean(m_wave_amplitudes), np.std(m_wave_amplitudes), np.mean(h_response_amplitudes), np.std(h_response_amplitudes)
+    num_chunks = max(1, min(get_num_threads(), traces.shape[0])) if NUMBA_AVAILABLE else 1
+    return _batch_mean_std(traces, m_start_index, m_end_index, h_start_index, h_end_index, method_id, num_chunks)
 
 def savgol_filter_y (y, polyorder=3):
     # Smoothen the data using Savitzky-Golay filtering
     window_length = int((len(y) / 100) * 25)
+    # Curves too short for a window longer than the polynomial order can't be smoothed; use them as they are.
+    if window_length <= polyorder:
+        return np.array(y, dtype=float)
     y_filtered = signal.savgol_filter(y, window_length, polyorder)
     return y_filtered
 
+# Curves at least this long use the compiled single-pass rolling std in detect_plateau; shorter ones aren't worth the compile.
+_ROLLING_STD_MIN_LENGTH = 1024
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _rolling_std(y, window_size):
+        """Population std of every length-window_size window of y, updating running sums as the window slides (O(len(y)), no window copies)."""
+        num_windows = y.shape[0] - window_size + 1
+        stds = np.empty(num_windows)
+        # Sums are taken relative to the first sample to limit cancellation in sum(x^2) - sum(x)^2 / n.
+        shift = y[0]
+        s1 = 0.0
+        s2 = 0.0
+        for i in range(window_size):
+            d = y[i] - shift
+            s1 += d
+            s2 += d * d
+        for i in range(num_windows):
+            if i > 0:
+                d_out = y[i - 1] - shift
+                d_in = y[i + window_size - 1] - shift
+                s1 += d_in - d_out
+                s2 += d_in * d_in - d_out * d_out
+            var = (s2 - s1 * s1 / window_size) / window_size
+            stds[i] = np.sqrt(var) if var > 0.0 else 0.0
+        return stds
+
 def detect_plateau(x, y, max_window_size, min_window_size, threshold, report=True):
     """
     Detects the plateau region in a reflex curve.
@@ -257,54 +697,84 @@ def detect_plateau(x, y, max_window_size, min_window_size, threshold, report=Tru
     Returns:
         tuple or None: A tuple containing the start and end indices of the plateau region, or None if no plateau region is detected.
     """
-    plateau_start_idx = None
-    plateau_end_idx = None
-
+    # Smooth once, then try each window size on the same filtered curve, from the largest down to the smallest.
     y_filtered = savgol_filter_y(y)
 
-    for i in range(len(y_filtered) - max_window_size):
-        window = y_filtered[i:i+max_window_size]
-        if np.std(window) < threshold:
-            # Calculate the slope of the window
-            if plateau_start_idx is None:
-                plateau_start_idx = i
-            plateau_end_idx = i + max_window_size
-        else:
-            plateau_start_idx = None
-            plateau_end_idx = None
-
-    if plateau_start_idx and plateau_end_idx is not None:
-        if report:
-            print(f"Plateau region detected with window size {max_window_size}. Threshold: {threshold} times SD.")
-        return plateau_start_idx, plateau_end_idx
-    # Shrink the window size and retry if no plateau region is detected.
-    elif max_window_size > min_window_size:
-        return detect_plateau(x, y, max_window_size-1, min_window_size, threshold, report=report)
+    for window_size in range(max_window_size, min_window_size - 1, -1):
+        plateau_start_idx, plateau_end_idx = _longest_plateau(y_filtered, window_size, threshold)
+        if plateau_start_idx is not None and plateau_end_idx is not None:
+            if report:
+                print(f"Plateau region detected with window size {window_size}. Threshold: {threshold} times SD.")
+            return plateau_start_idx, plateau_end_idx
+    return None, None
+
+def _longest_plateau(y_filtered, window_size, threshold):
+    """
+    Finds the longest run of consecutive sliding windows with a standard deviation below the threshold (the latest one, if several are equally long).
+
+    Windows start at indices 0 to len(y_filtered) - window_size - 1. Returns (start index of the run's first window, end index of its last window),
+    or (None, None) if no window is below the threshold.
+    """
+    num_windows = len(y_filtered) - window_size
+    if num_windows <= 0:
+        return None, None
+
+    if NUMBA_AVAILABLE and len(y_filtered) >= _ROLLING_STD_MIN_LENGTH:
+        window_stds = _rolling_std(np.ascontiguousarray(y_filtered, dtype=np.float64), window_size)[:num_windows]
     else:
+        window_stds = sliding_window_view(y_filtered, window_size)[:num_windows].std(axis=1)
+
+    # Rising and falling edges of the below-threshold mask give each run's [start, stop) window indices.
+    below_threshold = np.zeros(num_windows + 2, dtype=np.int8)
+    below_threshold[1:-1] = window_stds < threshold
+    edges = np.flatnonzero(np.diff(below_threshold))
+    if edges.size == 0:
         return None, None
+    run_starts, run_stops = edges[::2], edges[1::2]
+    run_lengths = run_stops - run_starts
+    longest_run = len(run_lengths) - 1 - np.argmax(run_lengths[::-1])
+
+    plateau_start_idx = int(run_starts[longest_run])
+    return plateau_start_idx, int(run_stops[longest_run]) - 1 + window_size
+
+@lru_cache(maxsize=256)
+def _detect_plateau_cached(y_bytes, y_dtype, max_window_size, min_window_size, threshold):
+    """
+    detect_plateau (without a report) for a curve given as raw bytes and dtype, so results can be cached by curve content.
+    """
+    y = np.frombuffer(y_bytes, dtype=y_dtype)
+    return detect_plateau(None, y, max_window_size, min_window_size, threshold, report=False)
 
 def get_avg_mmax (stimulus_voltages, m_wave_amplitudes, max_window_size=20, min_window_size=3, threshold=0.3, mmax_report=False, return_mmax_stim_range=False):
     """
     Get the M-wave amplitude and stimulus voltage at M-max.
     """
-    # Convert the lists to numpy arrays.
-    m_wave_amplitudes = np.array(m_wave_amplitudes)
+    # Convert lists to numpy arrays (arrays are used as is, without a copy).
+    m_wave_amplitudes = np.asarray(m_wave_amplitudes)
 
-    # Detect the plateau region in the reflex curve.
-    plateau_start_idx, plateau_end_idx = detect_plateau(stimulus_voltages, m_wave_amplitudes, max_window_size, min_window_size, threshold, report=mmax_report)
+    # Detect the plateau region in the reflex curve. Without a report, reuse the result for an identical curve and settings,
+    # since plots recompute M-max for the same data each time they are redrawn.
+    if mmax_report:
+        plateau_start_idx, plateau_end_idx = detect_plateau(stimulus_voltages, m_wave_amplitudes, max_window_size, min_window_size, threshold, report=True)
+    else:
+        plateau_start_idx, plateau_end_idx = _detect_plateau_cached(m_wave_amplitudes.tobytes(), m_wave_amplitudes.dtype.str, max_window_size, min_window_size, threshold)
 
     # Calculate the M-max amplitude using the plateau region m_wave_amplitudes.
     if plateau_start_idx is not None and plateau_end_idx is not None:
         plateau_data = m_wave_amplitudes[plateau_start_idx:plateau_end_idx]
-        plateau_data = np.array(plateau_data)
         
         m_max = np.mean(plateau_data)
         
         # Adjust the M-max amplitude by adding the average difference between the plateau data and the outlier data.
-        if m_max < max(m_wave_amplitudes):
-            m_max = m_max + np.mean(m_wave_amplitudes[m_wave_amplitudes > m_max]) - np.mean(plateau_data[plateau_data < np.max(plateau_data)])
+        if m_max < np.max(m_wave_amplitudes):
+            above_plateau_mean = np.mean(m_wave_amplitudes[m_wave_amplitudes > m_max])
+            plateau_max = np.max(plateau_data)
+            below_plateau_max = plateau_data[plateau_data < plateau_max]
+            # A flat plateau has no values below its maximum; compare against the maximum itself then.
+            below_plateau_max_mean = np.mean(below_plateau_max) if below_plateau_max.size else plateau_max
+            m_max = m_max + above_plateau_mean - below_plateau_max_mean
             if mmax_report:
-                print(f"\tM-max corrected by: {np.mean(m_wave_amplitudes[m_wave_amplitudes > m_max]) - np.mean(plateau_data)}")
+                print(f"\tM-max corrected by: {above_plateau_mean - below_plateau_max_mean}")
         
         # Return (and optionally print) the M-max amplitude.
         if mmax_report:
@@ -42,6 +42,15 @@ class EMGSessionPlotter(EMGPlotter):
         help: Displays the help text for the class.
 
     """
+    # Maps the accepted plotting method names onto the EMG_Transformer.calculate_emg_amplitude_idx method names.
+    # These are the calculate_emg_amplitude names, plus 'avg_rectified' as an alias of 'average_rectified'.
+    AMPLITUDE_METHODS = {
+        'rms': 'rms',
+        'average_rectified': 'average_rectified',
+        'avg_rectified': 'average_rectified',
+        'peak_to_trough': 'peak_to_trough',
+        'average_unrectified': 'average_unrectified',
+    }
 
     def __init__(self, data):
         """
@@ -63,6 +72,16 @@ class EMGSessionPlotter(EMGPlotter):
             return
         
         self.set_plot_defaults()
+
+        # Plot types accepted by EMGSession.plot, mapped to their plotting methods.
+        self.plot_map = {
+            'emg': self.plot_emg,
+            'suspectedH': self.plot_suspectedH,
+            'mmax': self.plot_mmax,
+            'reflexCurves': self.plot_reflexCurves,
+            'mCurvesSmoothened': self.plot_m_curves_smoothened,
+            'm_curves_smoothened': self.plot_m_curves_smoothened,
+        }
         
     def help(self):
         help_text = """
@@ -160,23 +179,11 @@ class EMGSessionPlotter(EMGPlotter):
                         ax.set_title(f'{channel_names[0]}')
                         ax.grid(True)
                         #ax.legend()
-                        if m_flags:
-                            ax.axvline(self.session.m_start[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
-                            ax.axvline(self.session.m_end[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)                         
-                        if h_flags:
-                            ax.axvline(self.session.h_start[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
-                            ax.axvline(self.session.h_end[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)                       
                     else:
                         axes[channel_index].plot(time_axis, channel_data[:num_samples_time_window], label=f"Stimulus Voltage: {recording['stimulus_v']}")
                         axes[channel_index].set_title(f'{channel_names[channel_index]}')
                         axes[channel_index].grid(True)
                         #axes[channel_index].legend()
-                        if m_flags:
-                            axes[channel_index].axvline(self.session.m_start[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
-                            axes[channel_index].axvline(self.session.m_end[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
-                        if h_flags:
-                            axes[channel_index].axvline(self.session.h_start[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
-                            axes[channel_index].axvline(self.session.h_end[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
         else:
             for recording in emg_recordings:
                 for channel_index, channel_data in enumerate(recording['channel_data']):
@@ -185,23 +192,20 @@ class EMGSessionPlotter(EMGPlotter):
                         ax.set_title('Channel 0')
                         ax.grid(True)
                         #ax.legend()
-                        if m_flags:
-                            ax.axvline(self.session.m_start[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
-                            ax.axvline(self.session.m_end[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)                         
-                        if h_flags:
-                            ax.axvline(self.session.h_start[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
-                            ax.axvline(self.session.h_end[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)  
                     else:
                         axes[channel_index].plot(time_axis, channel_data[:num_samples_time_window], label=f"Stimulus Voltage: {recording['stimulus_v']}")
                         axes[channel_index].set_title(f'Channel {channel_index}')
                         axes[channel_index].grid(True)
                         #axes[channel_index].legend()
-                        if m_flags:
-                            axes[channel_index].axvline(self.session.m_start[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
-                            axes[channel_index].axvline(self.session.m_end[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
-                        if h_flags:
-                            axes[channel_index].axvline(self.session.h_start[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
-                            axes[channel_index].axvline(self.session.h_end[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
+
+        # Draw the M-wave and H-reflex window flags once per channel, not once per recording.
+        for channel_index in range(self.session.num_channels):
+            if m_flags:
+                axes[channel_index].axvline(self.session.m_start[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
+                axes[channel_index].axvline(self.session.m_end[channel_index], color=self.session.m_color, linestyle=self.session.flag_style)
+            if h_flags:
+                axes[channel_index].axvline(self.session.h_start[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
+                axes[channel_index].axvline(self.session.h_end[channel_index], color=self.session.h_color, linestyle=self.session.flag_style)
 
         # Set labels and title
         if self.session.num_channels == 1:
@@ -253,11 +257,16 @@ class EMGSessionPlotter(EMGPlotter):
         else:
             fig, axes = plt.subplots(nrows=1, ncols=self.session.num_channels, figsize=(12, 4), sharey=True)
 
+        # Convert each channel's H-reflex window to sample indices once for all recordings.
+        h_window_indices = [EMG_Transformer.ms_to_idx(self.session.h_start[channel_index], self.session.h_end[channel_index], self.session.scan_rate)
+                            for channel_index in range(self.session.num_channels)]
+
         # Plot the EMG arrays for each channel, only for the first 10ms
         if customNames:
             for recording in self.session.recordings_processed:
                 for channel_index, channel_data in enumerate(recording['channel_data']):
-                    h_window = channel_data[int(self.session.h_start[channel_index] * self.session.scan_rate / 1000):int(self.session.h_end[channel_index] * self.session.scan_rate / 1000)]
+                    h_start_index, h_end_index = h_window_indices[channel_index]
+                    h_window = channel_data[h_start_index:h_end_index]
                     if max(h_window) - min(h_window) > h_threshold:  # Check amplitude variation within H-reflex window
                         if self.session.num_channels == 1:
                             ax.plot(time_axis, channel_data[:num_samples_time_window], label=f"Stimulus Voltage: {recording['stimulus_v']}")
@@ -274,7 +283,8 @@ class EMGSessionPlotter(EMGPlotter):
         else:
             for recording in self.session.recordings_processed:
                 for channel_index, channel_data in enumerate(recording['channel_data']):
-                    h_window = channel_data[int(self.session.h_start[channel_index] * self.session.scan_rate / 1000):int(self.session.h_end[channel_index] * self.session.scan_rate / 1000)]
+                    h_start_index, h_end_index = h_window_indices[channel_index]
+                    h_window = channel_data[h_start_index:h_end_index]
                     if max(h_window) - min(h_window) > h_threshold:  # Check amplitude variation within 5-10ms window
                         if self.session.num_channels == 1:
                             ax.plot(time_axis, channel_data[:num_samples_time_window], label=f"Stimulus Voltage: {recording['stimulus_v']}")
@@ -311,12 +321,18 @@ class EMGSessionPlotter(EMGPlotter):
 
         Args:
             channel_names (string, optional): List of custom channels names to be plotted. Must be the exact same length as the number of recorded channels in the dataset.
-            method (str, optional): The method used to calculate the mean and standard deviation. Options are 'rms', 'avg_rectified', or 'peak_to_trough'. Default is 'rms'.
+            method (str, optional): The method used to calculate the mean and standard deviation. Options are 'rms', 'average_rectified' (or 'avg_rectified'), 'peak_to_trough', or 'average_unrectified'. Default is 'rms'.
         """
         # Set method to default if not specified.
         if method is None:
             method = self.session.default_method
 
+        # Resolve the amplitude calculation once for all channels and recordings.
+        amplitude_method = self.AMPLITUDE_METHODS.get(method)
+        if amplitude_method is None:
+            print(f">! Error: method {method} is not supported. Please use 'rms', 'average_rectified', 'peak_to_trough', or 'average_unrectified'.")
+            return
+
         # Handle custom channel names parameter if specified.
         customNames = False
         if len(channel_names) == 0:
@@ -341,20 +357,15 @@ class EMGSessionPlotter(EMGPlotter):
             m_wave_amplitudes = []
             stimulus_voltages = []
 
+            # Convert this channel's M-wave window to sample indices once for all recordings.
+            m_start_index, m_end_index = EMG_Transformer.ms_to_idx(self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
+
             # Append the M-wave and H-response amplitudes for each recording into the superlist.
             for recording in self.session.recordings_processed:
                 channel_data = recording['channel_data'][channel_index]
                 stimulus_v = recording['stimulus_v']
                 
-                if method == 'rms':
-                    m_wave_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                elif method == 'avg_rectified':
-                    m_wave_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                elif method == 'peak_to_trough':
-                    m_wave_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                else:
-                    print(f">! Error: method {method} is not supported. Please use 'rms', 'avg_rectified', or 'peak_to_trough'.")
-                    return
+                m_wave_amplitude = EMG_Transformer.calculate_emg_amplitude_idx(channel_data, m_start_index, m_end_index, amplitude_method)
 
                 m_wave_amplitudes.append(m_wave_amplitude)
                 stimulus_voltages.append(stimulus_v)
@@ -422,12 +433,18 @@ class EMGSessionPlotter(EMGPlotter):
 
         Args:
             channel_names (string, optional): List of custom channels names to be plotted. Must be the exact same length as the number of recorded channels in the session.
-            method (str, optional): The method used to calculate the mean and standard deviation. Options are 'rms', 'avg_rectified', or 'peak_to_trough'. Default is 'rms'.
+            method (str, optional): The method used to calculate the mean and standard deviation. Options are 'rms', 'average_rectified' (or 'avg_rectified'), 'peak_to_trough', or 'average_unrectified'. Default is 'rms'.
         """
         # Set method to default if not specified.
         if method is None:
             method = self.session.default_method
 
+        # Resolve the amplitude calculation once for all channels and recordings.
+        amplitude_method = self.AMPLITUDE_METHODS.get(method)
+        if amplitude_method is None:
+            print(f">! Error: method {method} is not supported. Please use 'rms', 'average_rectified', 'peak_to_trough', or 'average_unrectified'.")
+            return
+
         # Handle custom channel names parameter if specified.
         customNames = False
         if len(channel_names) == 0:
@@ -450,23 +467,17 @@ class EMGSessionPlotter(EMGPlotter):
             h_response_amplitudes = []
             stimulus_voltages = []
 
+            # Convert this channel's M-wave and H-reflex windows to sample indices once for all recordings.
+            m_start_index, m_end_index = EMG_Transformer.ms_to_idx(self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
+            h_start_index, h_end_index = EMG_Transformer.ms_to_idx(self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
+
             # Append the M-wave and H-response amplitudes for each recording into the superlist.
             for recording in self.session.recordings_processed:
                 channel_data = recording['channel_data'][channel_index]
                 stimulus_v = recording['stimulus_v']
                 
-                if method == 'rms':
-                    m_wave_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                    h_response_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                elif method == 'avg_rectified':
-                    m_wave_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                    h_response_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                elif method == 'peak_to_trough':
-                    m_wave_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                    h_response_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                else:
-                    print(f">! Error: method {method} is not supported. Please use 'rms', 'avg_rectified', or 'peak_to_trough'.")
-                    return
+                m_wave_amplitude = EMG_Transformer.calculate_emg_amplitude_idx(channel_data, m_start_index, m_end_index, amplitude_method)
+                h_response_amplitude = EMG_Transformer.calculate_emg_amplitude_idx(channel_data, h_start_index, h_end_index, amplitude_method)
 
                 m_wave_amplitudes.append(m_wave_amplitude)
                 h_response_amplitudes.append(h_response_amplitude)
@@ -533,12 +544,18 @@ class EMGSessionPlotter(EMGPlotter):
 
         Args:
             channel_names (string, optional): List of custom channels names to be plotted. Must be the exact same length as the number of recorded channels in the dataset.
-            method (str, optional): The method used to calculate the mean and standard deviation. Options are 'rms', 'avg_rectified', or 'peak_to_trough'. Default is 'rms'.
+            method (str, optional): The method used to calculate the mean and standard deviation. Options are 'rms', 'average_rectified' (or 'avg_rectified'), 'peak_to_trough', or 'average_unrectified'. Default is 'rms'.
         """
         # Set method to default if not specified.
         if method is None:
             method = self.session.default_method
 
+        # Resolve the amplitude calculation once for all channels and recordings.
+        amplitude_method = self.AMPLITUDE_METHODS.get(method)
+        if amplitude_method is None:
+            print(f">! Error: method {method} is not supported. Please use 'rms', 'average_rectified', 'peak_to_trough', or 'average_unrectified'.")
+            return
+
         # Handle custom channel names parameter if specified.
         customNames = False
         if len(channel_names) == 0:
@@ -561,23 +578,17 @@ class EMGSessionPlotter(EMGPlotter):
             h_response_amplitudes = []
             stimulus_voltages = []
 
+            # Convert this channel's M-wave and H-reflex windows to sample indices once for all recordings.
+            m_start_index, m_end_index = EMG_Transformer.ms_to_idx(self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
+            h_start_index, h_end_index = EMG_Transformer.ms_to_idx(self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
+
             # Append the M-wave and H-response amplitudes for each recording into the superlist.
             for recording in self.session.recordings_processed:
                 channel_data = recording['channel_data'][channel_index]
                 stimulus_v = recording['stimulus_v']
                 
-                if method == 'rms':
-                    m_wave_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                    h_response_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                elif method == 'avg_rectified':
-                    m_wave_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                    h_response_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                elif method == 'peak_to_trough':
-                    m_wave_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.session.m_start[channel_index] + self.session.stim_delay, self.session.m_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                    h_response_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.session.h_start[channel_index] + self.session.stim_delay, self.session.h_end[channel_index] + self.session.stim_delay, self.session.scan_rate)
-                else:
-                    print(f">! Error: method {method} is not supported. Please use 'rms', 'avg_rectified', or 'peak_to_trough'.")
-                    return
+                m_wave_amplitude = EMG_Transformer.calculate_emg_amplitude_idx(channel_data, m_start_index, m_end_index, amplitude_method)
+                h_response_amplitude = EMG_Transformer.calculate_emg_amplitude_idx(channel_data, h_start_index, h_end_index, amplitude_method)
 
                 m_wave_amplitudes.append(m_wave_amplitude)
                 h_response_amplitudes.append(h_response_amplitude)
@@ -668,6 +679,12 @@ class EMGDatasetPlotter(EMGPlotter):
             return
 
         self.set_plot_defaults()
+
+        # Plot types accepted by EMGDataset.plot, mapped to their plotting methods.
+        self.plot_map = {
+            'reflexCurves': self.plot_reflexCurves,
+            'maxH': self.plot_maxH,
+        }
     
     def help(self):
         help_text = """
@@ -695,7 +712,7 @@ class EMGDatasetPlotter(EMGPlotter):
 
         Args:
             channel_names (list): A list of custom channel names. If specified, the channel names will be used in the plot titles.
-            method (str): The method used to calculate the mean and standard deviation. Options are 'rms', 'avg_rectified', or 'peak_to_trough'. Default is 'rms'.
+            method (str): The method used to calculate the mean and standard deviation. Options are 'rms', 'average_rectified' (or 'avg_rectified'), 'peak_to_trough', or 'average_unrectified'. Default is 'rms'.
 
         Returns:
             None
@@ -717,7 +734,6 @@ class EMGDatasetPlotter(EMGPlotter):
         recordings = []
         for session in self.dataset.emg_sessions:
             recordings.extend(session.recordings_processed)
-        sorted_recordings = sorted(recordings, key=lambda x: x['stimulus_v'])
 
         # Create a figure and axis
         if self.dataset.num_channels == 1:
@@ -727,7 +743,8 @@ class EMGDatasetPlotter(EMGPlotter):
             fig, axes = plt.subplots(nrows=1, ncols=self.dataset.num_channels, figsize=(12, 4), sharey=True)
 
         # Get unique binned stimulus voltages
-        stimulus_voltages = sorted(list(set([round(recording['stimulus_v'] / self.dataset.bin_size) * self.dataset.bin_size for recording in sorted_recordings])))
+        bin_groups = EMG_Transformer.group_recordings_by_bin(recordings, self.dataset.bin_size)
+        stimulus_voltages = sorted(bin_groups)
 
         # Plot the M-wave and H-response amplitudes for each channel
         for channel_index in range(self.dataset.num_channels):
@@ -736,35 +753,11 @@ class EMGDatasetPlotter(EMGPlotter):
             h_response_means = []
             h_response_stds = []
             for stimulus_v in stimulus_voltages:
-                m_wave_amplitudes = []
-                h_response_amplitudes = []
-                
-                # Append the M-wave and H-response amplitudes for the binned voltage into a list.
-                for recording in recordings:
-                    binned_stimulus_v = round(recording['stimulus_v'] / self.dataset.bin_size) * self.dataset.bin_size
-                    if binned_stimulus_v == stimulus_v:
-                        channel_data = recording['channel_data'][channel_index]
-                        if method == 'rms':
-                            m_wave_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                            h_response_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        elif method == 'avg_rectified':
-                            m_wave_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                            h_response_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        elif method == 'peak_to_trough':
-                            m_wave_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                            h_response_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        else:
-                            print(f">! Error: method {method} is not supported. Please use 'rms', 'avg_rectified', or 'peak_to_trough'.")
-                            return
-
-                        m_wave_amplitudes.append(m_wave_amplitude)
-                        h_response_amplitudes.append(h_response_amplitude)
-                
                 # Calculate the mean and standard deviation of the M-wave and H-response amplitudes for the binned voltage.
-                m_wave_mean = np.mean(m_wave_amplitudes)
-                m_wave_std = np.std(m_wave_amplitudes)
-                h_response_mean = np.mean(h_response_amplitudes)
-                h_response_std = np.std(h_response_amplitudes)
+                m_wave_mean, m_wave_std, h_response_mean, h_response_std = EMG_Transformer.calculate_mean_std(recordings, stimulus_v, self.dataset.bin_size, channel_index,
+                                                                                                              self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay,
+                                                                                                              self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay,
+                                                                                                              self.dataset.scan_rate, method=method, bin_groups=bin_groups)
 
                 # Append the mean and standard deviation to the superlist.
                 m_wave_means.append(m_wave_mean)
@@ -835,7 +828,7 @@ class EMGDatasetPlotter(EMGPlotter):
 
         Args:
             channel_names (list): List of custom channel names. Default is an empty list.
-            method (str): Method for calculating the amplitude. Options are 'rms', 'avg_rectified', or 'peak_to_trough'. Default is 'rms'.
+            method (str): Method for calculating the amplitude. Options are 'rms', 'average_rectified' (or 'avg_rectified'), 'peak_to_trough', or 'average_unrectified'. Default is 'rms'.
             relative_to_mmax (bool): Flag indicating whether to make the M-wave amplitudes relative to the maximum M-wave amplitude. Default is False.
             manual_mmax (float): Manual value for the maximum M-wave amplitude. Default is None.
 
@@ -860,7 +853,6 @@ class EMGDatasetPlotter(EMGPlotter):
         recordings = []
         for session in self.dataset.emg_sessions:
             recordings.extend(session.recordings_processed)
-        sorted_recordings = sorted(recordings, key=lambda x: x['stimulus_v'])
 
         # Create a figure and axis
         if self.dataset.num_channels == 1:
@@ -870,7 +862,8 @@ class EMGDatasetPlotter(EMGPlotter):
             fig, axes = plt.subplots(nrows=1, ncols=self.dataset.num_channels, figsize=(8, 4), sharey=True)
 
         # Get unique binned stimulus voltages
-        stimulus_voltages = sorted(list(set([round(recording['stimulus_v'] / self.dataset.bin_size) * self.dataset.bin_size for recording in sorted_recordings])))
+        bin_groups = EMG_Transformer.group_recordings_by_bin(recordings, self.dataset.bin_size)
+        stimulus_voltages = sorted(bin_groups)
 
         for channel_index in range(self.dataset.num_channels):
             if relative_to_mmax:
@@ -880,34 +873,11 @@ class EMGDatasetPlotter(EMGPlotter):
             
             # Find the binned voltage where the average H-reflex amplitude is maximal and calculate the mean M-wave responses for M-max correction if relative_to_mmax is True.
             for stimulus_v in stimulus_voltages:
-                if relative_to_mmax:
-                    m_wave_amplitudes = []
-                h_response_amplitudes = []
-                
-                # Append the M-wave and H-response amplitudes for the binned voltage into a list.
-                for recording in recordings:
-                    binned_stimulus_v = round(recording['stimulus_v'] / self.dataset.bin_size) * self.dataset.bin_size
-                    if binned_stimulus_v == stimulus_v:
-                        channel_data = recording['channel_data'][channel_index]
-                        if method == 'rms':
-                            if relative_to_mmax:
-                                m_wave_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                            h_response_amplitude = EMG_Transformer._calculate_rms_amplitude(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        elif method == 'avg_rectified':
-                            if relative_to_mmax:
-                                m_wave_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                            h_response_amplitude = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        elif method == 'peak_to_trough':
-                            if relative_to_mmax:
-                                m_wave_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                            h_response_amplitude = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        else:
-                            print(f">! Error: method {method} is not supported. Please use 'rms', 'avg_rectified', or 'peak_to_trough'.")
-                            return
-
-                        if relative_to_mmax:
-                            m_wave_amplitudes.append(m_wave_amplitude)
-                        h_response_amplitudes.append(h_response_amplitude)
+                # Calculate the M-wave and H-response amplitudes for the binned voltage.
+                m_wave_amplitudes, h_response_amplitudes = EMG_Transformer.calculate_binned_amplitudes(recordings, stimulus_v, self.dataset.bin_size, channel_index,
+                                                                                                       self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay,
+                                                                                                       self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay,
+                                                                                                       self.dataset.scan_rate, method=method, bin_groups=bin_groups)
                 
                 if relative_to_mmax:
                     # Append the M-wave mean to the superlist.
@@ -923,28 +893,10 @@ class EMGDatasetPlotter(EMGPlotter):
 
             # Get data to plot in whisker plot.
 
-            m_wave_amplitudes_max_h = []
-            h_response_amplitudes_max_h = []
-
-            for recording in recordings:
-                binned_stimulus_v = round(recording['stimulus_v'] / self.dataset.bin_size) * self.dataset.bin_size
-                if binned_stimulus_v == max_h_reflex_voltage:
-                    channel_data = recording['channel_data'][channel_index]
-                    if method == 'rms':
-                        m_wave_amplitude_max_h = EMG_Transformer._calculate_rms_amplitude(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        h_response_amplitude_max_h = EMG_Transformer._calculate_rms_amplitude(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                    elif method == 'avg_rectified':
-                        m_wave_amplitude_max_h = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        h_response_amplitude_max_h = EMG_Transformer._calculate_average_amplitude_rectified(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                    elif method == 'peak_to_trough':
-                        m_wave_amplitude_max_h = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                        h_response_amplitude_max_h = EMG_Transformer._calculate_peak_to_trough_amplitude(channel_data, self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay, self.dataset.scan_rate)
-                    else:
-                        print(f">! Error: method {method} is not supported. Please use 'rms', 'avg_rectified', or 'peak_to_trough'.")
-                        return
-                
-                    m_wave_amplitudes_max_h.append(m_wave_amplitude_max_h)
-                    h_response_amplitudes_max_h.append(h_response_amplitude_max_h)
+            m_wave_amplitudes_max_h, h_response_amplitudes_max_h = EMG_Transformer.calculate_binned_amplitudes(recordings, max_h_reflex_voltage, self.dataset.bin_size, channel_index,
+                                                                                                                self.dataset.m_start[channel_index] + self.dataset.stim_delay, self.dataset.m_end[channel_index] + self.dataset.stim_delay,
+                                                                                                                self.dataset.h_start[channel_index] + self.dataset.stim_delay, self.dataset.h_end[channel_index] + self.dataset.stim_delay,
+                                                                                                                self.dataset.scan_rate, method=method, bin_groups=bin_groups)
 
             # Make the M-wave amplitudes relative to the maximum M-wave amplitude if specified.
             if relative_to_mmax:
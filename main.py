@@ -2,9 +2,13 @@ import tkinter as tk
 from tkinter import filedialog, ttk
 import os
 import io
-from Analyze_EMG import EMGSession, EMGDataset, unpackPickleOutput, getDatasetInfo, dataset_from_dataset_dict
+from collections import OrderedDict
+from Analyze_EMG import EMGData, EMGSession, EMGDataset
 
 class EMGAnalysisGUI(tk.Tk):
+    # Number of recently used sessions/datasets kept in memory, so re-selecting one does not reload it from disk.
+    CACHE_SIZE = 4
+
     def __init__(self):
         super().__init__()
         self.title("EMG Analysis GUI")
@@ -13,8 +17,12 @@ class EMGAnalysisGUI(tk.Tk):
         # Set the output folder path
         self.output_folder = os.path.join(os.getcwd(), "output")
 
-        # Unpack the pickled outputs
-        self.dataset_dict, self.dataset_names = unpackPickleOutput(self.output_folder)
+        # The pickled outputs are unpacked once the window is up (see unpack_output_folder).
+        self.dataset_dict, self.dataset_names = {}, []
+
+        # Recently loaded sessions/datasets, oldest first.
+        self._session_cache = OrderedDict()
+        self._dataset_cache = OrderedDict()
 
         # Create tabs
         self.tabControl = ttk.Notebook(self)
@@ -27,7 +35,7 @@ class EMGAnalysisGUI(tk.Tk):
         # Create widgets for Session Analysis tab
         self.session_label = ttk.Label(self.session_tab, text="Select a session:")
         self.session_label.pack(pady=10)
-        self.session_combo = ttk.Combobox(self.session_tab, values=self.get_all_sessions(), state="readonly")
+        self.session_combo = ttk.Combobox(self.session_tab, values=[], state="readonly")
         self.session_combo.pack()
         self.session_analyze_button = ttk.Button(self.session_tab, text="Analyze Session", command=self.analyze_session)
         self.session_analyze_button.pack(pady=10)
@@ -47,7 +55,7 @@ class EMGAnalysisGUI(tk.Tk):
         # Create widgets for Dataset Analysis tab
         self.dataset_label = ttk.Label(self.dataset_tab, text="Select a dataset:")
         self.dataset_label.pack(pady=10)
-        self.dataset_combo = ttk.Combobox(self.dataset_tab, values=self.dataset_names, state="readonly")
+        self.dataset_combo = ttk.Combobox(self.dataset_tab, values=[], state="readonly")
         self.dataset_combo.pack()
         self.dataset_analyze_button = ttk.Button(self.dataset_tab, text="Analyze Dataset", command=self.analyze_dataset)
         self.dataset_analyze_button.pack(pady=10)
@@ -64,6 +72,15 @@ class EMGAnalysisGUI(tk.Tk):
         self.dataset_plot_button = ttk.Button(self.dataset_plot_frame, text="Plot Data", command=self.plot_dataset_data)
         self.dataset_plot_button.grid(row=0, column=2, padx=5)
 
+        # Scan the output folder after the event loop has drawn the window, so startup is not held up by the directory walk.
+        self.after(0, self.unpack_output_folder)
+
+    def unpack_output_folder(self):
+        # Unpack the pickled outputs and fill the session/dataset selections.
+        self.dataset_dict, self.dataset_names = EMGData.unpackPickleOutput(self.output_folder)
+        self.session_combo['values'] = self.get_all_sessions()
+        self.dataset_combo['values'] = self.dataset_names
+
     def get_all_sessions(self):
         all_sessions = []
         for dataset in self.dataset_dict.values():
@@ -71,10 +88,28 @@ class EMGAnalysisGUI(tk.Tk):
                 all_sessions.append(session)
         return all_sessions
 
+    def _get_cached(self, cache, key, load):
+        # Return cache[key], loading it on a miss and evicting the least recently used entry when full.
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        obj = load()
+        cache[key] = obj
+        if len(cache) > self.CACHE_SIZE:
+            cache.popitem(last=False)
+        return obj
+
+    def get_session(self, session_file):
+        return self._get_cached(self._session_cache, session_file, lambda: EMGSession(session_file))
+
+    def get_dataset(self, dataset_name):
+        return self._get_cached(self._dataset_cache, dataset_name,
+                                lambda: EMGDataset.dataset_from_dataset_dict(self.dataset_dict, self.dataset_names, self.dataset_names.index(dataset_name)))
+
     def analyze_session(self):
         session_file = self.session_combo.get()
         if session_file:
-            session = EMGSession(session_file)
+            session = self.get_session(session_file)
             self.session_output.delete('1.0', tk.END)
             self.session_output.insert(tk.END, f"Analyzing session: {session.session_name}\n\n")
             # Capture the output of session_parameters
@@ -89,15 +124,14 @@ class EMGAnalysisGUI(tk.Tk):
     def plot_session_data(self):
         session_file = self.session_combo.get()
         if session_file:
-            session = EMGSession(session_file)
+            session = self.get_session(session_file)
             plot_type = str(self.session_plot_type_combo.get())
             session.plot(plot_type=plot_type)
 
     def analyze_dataset(self):
         selected_dataset = self.dataset_combo.get()
         if selected_dataset:
-            date, animal_id, condition = getDatasetInfo(selected_dataset)
-            dataset = dataset_from_dataset_dict(self.dataset_dict, self.dataset_names, self.dataset_names.index(selected_dataset))
+            dataset = self.get_dataset(selected_dataset)
             self.dataset_output.delete('1.0', tk.END)
             self.dataset_output.insert(tk.END, f"Analyzing dataset: {selected_dataset}\n\n")
             # Capture the output of dataset_parameters
@@ -112,8 +146,7 @@ class EMGAnalysisGUI(tk.Tk):
     def plot_dataset_data(self):
         selected_dataset = self.dataset_combo.get()
         if selected_dataset:
-            date, animal_id, condition = getDatasetInfo(selected_dataset)
-            dataset = dataset_from_dataset_dict(self.dataset_dict, self.dataset_names, self.dataset_names.index(selected_dataset))
+            dataset = self.get_dataset(selected_dataset)
             plot_type = str(self.dataset_plot_type_combo.get())
             dataset.plot(plot_type=plot_type)
 
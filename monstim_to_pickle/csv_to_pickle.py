@@ -1,8 +1,13 @@
 import os
 import re
 import pickle
+import pickletools
 import numpy as np
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# Worker processes for CSV parsing, computed once. One core is left for the main process, which collects results and writes the session pickles.
+_MAX_WORKERS = max(1, (os.cpu_count() or 1) - 1)
 
 def read_csv(file_path):
     """Helper function to read a CSV file and return its lines."""
@@ -84,8 +89,19 @@ def process_recording(recording_file, session_info):
     stimulus_v, channel_data = extract_recording_data(lines, session_info['num_channels'])
     return {'stimulus_v': stimulus_v, 'channel_data': channel_data}
 
-def process_session(dir, session_name, csv_paths, output_path):
-    """Main function to process a directory of recording CSVs into a single recording session pickle object."""
+def save_session_pickle(session_data, file_path):
+    """Helper function to write session data to a pickle file.
+    
+    Sessions are written at the highest pickle protocol and run through pickletools.optimize, which strips the unused PUT opcodes and makes the file smaller and faster to load.
+    Existing session pickles are read as before, and are upgraded the next time they are rewritten."""
+    data = pickletools.optimize(pickle.dumps(session_data, protocol=pickle.HIGHEST_PROTOCOL))
+    with open(file_path, 'wb') as pickle_file:
+        pickle_file.write(data)
+
+def process_session(dir, session_name, csv_paths, output_path, executor=None):
+    """Main function to process a directory of recording CSVs into a single recording session pickle object.
+    
+    Pass a shared ProcessPoolExecutor as executor to reuse its worker processes; otherwise a pool is created for this session."""
     first_csv = csv_paths[0]
     lines = read_csv(first_csv)
     session_id, num_channels, scan_rate, num_samples, stim_delay, stim_duration, stim_interval, emg_amp_gains = extract_session_info(lines)
@@ -102,7 +118,10 @@ def process_session(dir, session_name, csv_paths, output_path):
         'emg_amp_gains': emg_amp_gains
     }
 
-    with ProcessPoolExecutor() as executor:
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=_MAX_WORKERS) as session_executor:
+            recordings = list(filter(None, session_executor.map(process_recording, csv_paths, [session_info] * len(csv_paths))))
+    else:
         recordings = list(filter(None, executor.map(process_recording, csv_paths, [session_info] * len(csv_paths))))
 
     session_data = {
@@ -111,8 +130,7 @@ def process_session(dir, session_name, csv_paths, output_path):
     }
 
     save_name = f'{dir}_{session_name}-SessionData.pickle'
-    with open(os.path.join(output_path, save_name), 'wb') as pickle_file:
-        pickle.dump(session_data, pickle_file)
+    save_session_pickle(session_data, os.path.join(output_path, save_name))
 
     print(f'> {len(recordings)} of {len(csv_paths)} CSVs processed from session "{session_name}".')
 
@@ -133,13 +151,14 @@ def pickle_data(data_path, output_path):
     datasets = [dir for dir in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, dir))]
     print(f'Datasets to process ({len(datasets)}): {datasets}')
 
-    def process_sessions_for_dataset(dataset_dir):
+    def process_sessions_for_dataset(dataset_dir, process_executor, thread_executor):
+        """Processes a dataset's sessions on the shared pools. Returns True if the shared process pool broke and must be replaced."""
         dataset_path = os.path.join(data_path, dataset_dir)
         dataset_session_dict = getDatasetSessionDict(dataset_path)
 
         if len(dataset_session_dict) <= 0:
             print(f'>! Error: no CSV files detected in "{dataset_dir}." Make sure you converted STMs to CSVs.')
-            return
+            return False
 
         if len(dataset_session_dict) > 1:
             dataset_output_path = os.path.join(output_path, dataset_dir)
@@ -147,18 +166,38 @@ def pickle_data(data_path, output_path):
         else:
             dataset_output_path = output_path
 
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for session_name, csv_paths in dataset_session_dict.items():
-                futures.append(executor.submit(process_session, dataset_dir, session_name, csv_paths, dataset_output_path))
-            
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as exc:
-                    print(f'>! Error in processing session: {exc}')
-
-    for dataset_dir in datasets:
-        process_sessions_for_dataset(dataset_dir)
+        futures = {}
+        for session_name, csv_paths in dataset_session_dict.items():
+            futures[thread_executor.submit(process_session, dataset_dir, session_name, csv_paths, dataset_output_path, process_executor)] = session_name
+        
+        broken_sessions = []
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except BrokenProcessPool:
+                # A worker died, which fails every session still using the shared pool, not just the one that crashed it.
+                broken_sessions.append(futures[future])
+            except Exception as exc:
+                print(f'>! Error in processing session: {exc}')
+
+        # Retry those sessions one at a time, each with its own pool, so a crash only costs the session that caused it.
+        for session_name in broken_sessions:
+            try:
+                process_session(dataset_dir, session_name, dataset_session_dict[session_name], dataset_output_path)
+            except Exception as exc:
+                print(f'>! Error in processing session "{session_name}": {exc}')
+        return bool(broken_sessions)
+
+    # Share one pool of worker processes (and one thread pool) across all datasets and sessions instead of starting new ones for each.
+    process_executor = ProcessPoolExecutor(max_workers=_MAX_WORKERS)
+    try:
+        with ThreadPoolExecutor() as thread_executor:
+            for dataset_dir in datasets:
+                if process_sessions_for_dataset(dataset_dir, process_executor, thread_executor):
+                    # The shared pool is broken; start a fresh one for the remaining datasets.
+                    process_executor.shutdown()
+                    process_executor = ProcessPoolExecutor(max_workers=_MAX_WORKERS)
+    finally:
+        process_executor.shutdown()
 
     print('Processing complete.')
\ No newline at end of file